@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import sys
+
+from thumbnails import ThumbnailCache, file_hash
+
+# --------------------------------------------------
+# Settings
+# --------------------------------------------------
+MANIFEST_PATH = os.environ.get("SWIFTBUY_MANIFEST", "data/image_manifest.json")
+
+log = logging.getLogger("swiftbuy.assets")
+
+
+def _dir_stamp(dirs):
+    # One stat per image directory; adding, removing or renaming a file changes it
+    return {d: os.stat(d).st_mtime_ns for d in sorted(dirs) if os.path.isdir(d)}
+
+
+def _listing(directory, cache):
+    # lower-cased name -> real name, listed once per directory
+    if directory not in cache:
+        try:
+            cache[directory] = {n.lower(): n for n in os.listdir(directory)}
+        except OSError:
+            cache[directory] = {}
+    return cache[directory]
+
+
+# --------------------------------------------------
+# Image manifest (resolved path, size, mtime and hash per catalog image)
+# --------------------------------------------------
+def _image_entry(path):
+    from PIL import Image   # only needed when an entry is (re)built
+
+    info = os.stat(path)
+    with Image.open(path) as im:
+        width, height = im.size
+    return {"path": path, "width": width, "height": height, "hash": file_hash(path),
+            "bytes": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def build_manifest(catalog):
+    images, problems, listings = {}, [], {}
+    for i in range(len(catalog)):
+        sku, declared = catalog.sku[i], catalog.image[i]
+        if declared in images:
+            continue
+        directory, name = os.path.split(declared)
+        real = _listing(directory or ".", listings).get(name.lower())
+        if real is None:
+            images[declared] = None
+            problems.append({"sku": sku, "image": declared, "issue": "missing"})
+            continue
+        path = os.path.join(directory, real)
+        if real != name:
+            problems.append({"sku": sku, "image": declared, "issue": f"case mismatch, using {path}"})
+        try:
+            images[declared] = _image_entry(path)
+        except OSError as e:
+            images[declared] = None
+            problems.append({"sku": sku, "image": declared, "issue": f"unreadable: {e}"})
+
+    return {"catalog_version": catalog.version, "dirs": _dir_stamp(listings),
+            "images": images, "problems": problems}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _refresh(manifest):
+    # An image overwritten in place keeps its directory mtime, so each file is stat'ed too;
+    # only entries whose size or mtime moved are re-hashed. Returns how many changed.
+    changed = 0
+    for declared, entry in manifest["images"].items():
+        if entry is None:
+            continue
+        info = os.stat(entry["path"])
+        if (info.st_size, info.st_mtime_ns) != (entry["bytes"], entry.get("mtime_ns")):
+            manifest["images"][declared] = _image_entry(entry["path"])
+            changed += 1
+    return changed
+
+
+def load_manifest(catalog, path=MANIFEST_PATH):
+    # The saved manifest is reused while the catalog and image folders are unchanged,
+    # with entries for files replaced in place brought up to date
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest["catalog_version"] == catalog.version and manifest["dirs"] == _dir_stamp(manifest["dirs"]):
+            if _refresh(manifest):
+                save_manifest(manifest, path)
+            return manifest
+    except (OSError, ValueError, KeyError):
+        pass
+
+    manifest = build_manifest(catalog)
+    for p in manifest["problems"]:
+        log.warning("image for %s (%s): %s", p["sku"], p["image"], p["issue"])
+    try:
+        save_manifest(manifest, path)
+    except OSError:
+        log.warning("could not write %s", path)
+    return manifest
+
+
+# --------------------------------------------------
+# Warm-up (run at deploy, before the first session)
+# --------------------------------------------------
+def warm_up(catalog, thumbs=None):
+    manifest = load_manifest(catalog)
+    thumbs = thumbs or ThumbnailCache(manifest=manifest["images"])
+    built = thumbs.build_all(manifest["images"])
+    return manifest, built
+
+
+# --------------------------------------------------
+# CLI: python assets.py [--rebuild]
+# --------------------------------------------------
+if __name__ == "__main__":
+    from catalog import Catalog, CATALOG_PATH
+
+    if "--rebuild" in sys.argv[1:] and os.path.exists(MANIFEST_PATH):
+        os.remove(MANIFEST_PATH)
+    manifest, built = warm_up(Catalog.from_csv(CATALOG_PATH))
+    for p in manifest["problems"]:
+        print(f"{p['sku']}: {p['image']}: {p['issue']}")
+    print(f"{len(manifest['images'])} images, {len(manifest['problems'])} problems, "
+          f"{built} thumbnails ready; manifest at {MANIFEST_PATH}")
@@ -0,0 +1,327 @@
+# --------------------------------------------------
+# SwiftBuy load benchmark
+#
+#   python bench/run_bench.py --sessions 8 --steps 25 --catalog-size 10000 100000
+#   python bench/run_bench.py --compare bench/results/<older>.json
+#
+# Simulates concurrent Streamlit sessions with AppTest (browse with random
+# filters/sort, page, add to cart, check out, work the ticket queue) and
+# writes rerun latency percentiles, bytes per rerun and memory per session
+# to a JSON file so runs can be compared. AppTest is not thread-safe, so
+# sessions are spread over worker processes (like app server workers sharing
+# one SQLite store) and interleaved step by step inside each worker.
+# --------------------------------------------------
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import multiprocessing
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+SHOP = "shopping.py"
+CHECKOUT = "pages/checkout.py"
+TICKETS = "pages/tickets.py"
+
+
+# --------------------------------------------------
+# Synthetic catalog
+# --------------------------------------------------
+def make_catalog(size, path, seed=0):
+    # Reuses the real vocabularies and images so thumbnails stay realistic
+    with open(os.path.join(ROOT, "data", "products.csv"), newline="", encoding="utf-8") as f:
+        base = list(csv.DictReader(f))
+    vocab = {k: sorted({row[k] for row in base}) for k in ("category", "color", "feature", "image")}
+
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["sku", "name", "price", "category", "color", "feature", "description", "image"])
+        for i in range(size):
+            w.writerow([
+                f"BN-{i:07d}", f"Bench Item {i}", rng.choice([rng.randint(10, 120), rng.randint(100, 1500)]),
+                rng.choice(vocab["category"]), rng.choice(vocab["color"]), rng.choice(vocab["feature"]),
+                "Synthetic product for load testing.", rng.choice(vocab["image"]),
+            ])
+
+
+# --------------------------------------------------
+# One simulated browser session
+# --------------------------------------------------
+def payload_bytes(node):
+    # Serialized size of every element in the rendered tree
+    total = 0
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize"):
+        total += proto.ByteSize()
+    for child in getattr(node, "children", {}).values():
+        total += payload_bytes(child)
+    return total
+
+
+class Session:
+    def __init__(self, rng, samples, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = rng
+        self.samples = samples
+        self.at = AppTest.from_file(os.path.join(ROOT, SHOP), default_timeout=timeout)
+        self.page = SHOP
+
+    def rerun(self, action, run):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        errors = [e.value for e in self.at.exception]
+        self.samples.append({
+            "page": self.page, "action": action, "seconds": elapsed,
+            "bytes": payload_bytes(self.at._tree), "errors": len(errors),
+        })
+
+    def goto(self, page):
+        self.page = page
+        self.rerun("open", self.at.switch_page(page).run)
+
+    def select(self, label):
+        boxes = [s for s in self.at.selectbox if s.label == label]
+        if boxes:
+            box = boxes[0]
+            self.rerun(f"select {label}", box.select(self.rng.choice(box.options)).run)
+
+    def click(self, action, labels):
+        buttons = [b for b in self.at.button if b.label in labels and not b.disabled]
+        if buttons:
+            self.rerun(action, self.rng.choice(buttons).click().run)
+
+    # --- actions ---
+    def browse(self):
+        if self.page != SHOP:
+            self.goto(SHOP)
+        self.select(self.rng.choice(["Category", "Color", "Features", "Price", "Sort", "Per page"]))
+
+    def flip_page(self):
+        if self.page != SHOP:
+            self.goto(SHOP)
+        self.click("page", ["Next ▶", "◀ Prev"])
+
+    def add_to_cart(self):
+        if self.page != SHOP:
+            self.goto(SHOP)
+        self.click("add to cart", ["Add to Cart"])
+
+    def checkout(self):
+        self.add_to_cart()
+        self.goto(CHECKOUT)
+        if not self.at.text_input:
+            return
+        self.at.text_input[0].input("Bench User")
+        self.at.text_input[1].input("bench@example.com")
+        self.at.text_input[2].input("09170000000")
+        self.at.text_area[0].input("1 Bench Street")
+        self.click("place order", ["✅ Place Order"])
+
+    def work_tickets(self):
+        if self.page != TICKETS:
+            self.goto(TICKETS)
+        self.click("ticket action", ["Assign", "Resolve"])
+
+    def open(self):
+        self.rerun("open", self.at.run)
+
+    def step(self):
+        actions = [self.browse] * 5 + [self.flip_page] * 2 + [self.add_to_cart] * 3 + \
+                  [self.checkout, self.work_tickets]
+        self.rng.choice(actions)()
+
+    def run(self, steps):
+        self.open()
+        for _ in range(steps):
+            self.step()
+
+
+# --------------------------------------------------
+# Reporting
+# --------------------------------------------------
+def percentiles(values):
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {"count": len(values), "mean": statistics.fmean(values),
+            "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": values[-1]}
+
+
+def summarize(samples):
+    by_page = {}
+    for s in samples:
+        by_page.setdefault(s["page"], []).append(s)
+    report = {
+        "reruns": percentiles([s["seconds"] for s in samples]),
+        "bytes_per_rerun": percentiles([s["bytes"] for s in samples]),
+        "errors": sum(s["errors"] for s in samples),
+        "pages": {},
+    }
+    for page, rows in sorted(by_page.items()):
+        report["pages"][page] = {
+            "reruns": percentiles([s["seconds"] for s in rows]),
+            "bytes_per_rerun": percentiles([s["bytes"] for s in rows]),
+        }
+    return report
+
+
+def memory_per_session(sessions, steps, timeout):
+    # Separate pass: tracemalloc slows reruns down, so latency is measured without it.
+    # A first untraced session pays for imports and shared caches.
+    Session(random.Random(-1), [], timeout).run(2)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    live = []
+    for i in range(sessions):
+        s = Session(random.Random(1000 + i), [], timeout)
+        s.run(steps)
+        live.append(s)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / max(1, sessions)
+
+
+def setup(db_path, catalog_path):
+    os.environ["SWIFTBUY_DB"] = db_path
+    if catalog_path:
+        os.environ["SWIFTBUY_CATALOG"] = catalog_path
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def worker(job):
+    # One app worker process running several sessions round-robin
+    db_path, catalog_path, seeds, steps, timeout = job
+    setup(db_path, catalog_path)
+    Session(random.Random(-1), [], timeout).run(2)   # warm caches, not measured
+
+    samples = []
+    sessions = [Session(random.Random(seed), samples, timeout) for seed in seeds]
+    for s in sessions:
+        s.open()
+    for _ in range(steps):
+        for s in sessions:
+            s.step()
+    return samples
+
+
+def run_once(args, size):
+    tmp = tempfile.mkdtemp(prefix="swiftbuy-bench-")
+    db_path = os.path.join(tmp, "bench.db")
+    catalog_path = None
+    if size:
+        catalog_path = os.path.join(tmp, "catalog.csv")
+        make_catalog(size, catalog_path, args.seed)
+    setup(db_path, catalog_path)
+
+    from catalog import Catalog, CATALOG_PATH
+    start = time.perf_counter()
+    catalog_size = len(Catalog.from_csv(CATALOG_PATH))
+    load_seconds = time.perf_counter() - start
+
+    workers = max(1, min(args.workers, args.sessions))
+    seeds = [args.seed + i for i in range(args.sessions)]
+    jobs = [(db_path, catalog_path, seeds[w::workers], args.steps, args.timeout) for w in range(workers)]
+
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        samples = [s for part in pool.map(worker, jobs) for s in part]
+    wall = time.perf_counter() - started
+
+    report = summarize(samples)
+    report.update({
+        "catalog_size": catalog_size,
+        "catalog_load_seconds": load_seconds,
+        "sessions": args.sessions,
+        "workers": workers,
+        "steps": args.steps,
+        "wall_seconds": wall,
+        "reruns_per_second": len(samples) / wall if wall else 0,
+        "memory_per_session_bytes": memory_per_session(args.memory_sessions, args.steps, args.timeout),
+    })
+    return report
+
+
+# --------------------------------------------------
+# Compare two result files
+# --------------------------------------------------
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = {r["catalog_size"]: r for r in json.load(f)["runs"]}
+    with open(new_path) as f:
+        new = {r["catalog_size"]: r for r in json.load(f)["runs"]}
+    for size in sorted(set(old) & set(new)):
+        print(f"catalog_size={size}")
+        for metric in ("p50", "p95", "p99"):
+            a = old[size]["reruns"][metric]
+            b = new[size]["reruns"][metric]
+            print(f"  rerun {metric}: {a*1000:8.1f} ms -> {b*1000:8.1f} ms ({(b-a)/a*100:+.1f}%)")
+        a = old[size]["bytes_per_rerun"]["mean"]
+        b = new[size]["bytes_per_rerun"]["mean"]
+        print(f"  bytes/rerun: {a:8.0f} -> {b:8.0f} ({(b-a)/a*100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SwiftBuy load benchmark")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--catalog-size", type=int, nargs="*", default=[0],
+                        help="synthetic catalog sizes (0 = data/products.csv)")
+    parser.add_argument("--memory-sessions", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", help="result file (default bench/results/bench-<time>.json)")
+    parser.add_argument("--compare", help="older result file to compare the new run against")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+
+    if args.single:
+        runs = [run_once(args, args.catalog_size[0])]
+    else:
+        # Each catalog size runs in its own process so caches start cold
+        runs = []
+        for size in args.catalog_size:
+            part = f"{out}.{size}.part"
+            cmd = [sys.executable, os.path.abspath(__file__), "--single", "--out", part,
+                   "--catalog-size", str(size), "--sessions", str(args.sessions),
+                   "--steps", str(args.steps), "--workers", str(args.workers),
+                   "--memory-sessions", str(args.memory_sessions),
+                   "--seed", str(args.seed), "--timeout", str(args.timeout)]
+            subprocess.run(cmd, check=True)
+            with open(part) as f:
+                runs.extend(json.load(f)["runs"])
+            os.remove(part)
+
+    with open(out, "w") as f:
+        json.dump({"created_at": datetime.now().isoformat(timespec="seconds"), "runs": runs}, f, indent=2)
+
+    if not args.single:
+        for r in runs:
+            print(f"catalog={r['catalog_size']:>8} p50={r['reruns']['p50']*1000:.1f}ms "
+                  f"p95={r['reruns']['p95']*1000:.1f}ms p99={r['reruns']['p99']*1000:.1f}ms "
+                  f"bytes/rerun={r['bytes_per_rerun']['mean']:.0f} "
+                  f"mem/session={r['memory_per_session_bytes']/1024:.0f}KiB errors={r['errors']}")
+        print(f"results written to {out}")
+        if args.compare:
+            compare(args.compare, out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import uuid
+from decimal import ROUND_HALF_UP, Decimal
+
+import streamlit as st
+
+from storage import get_store
+
+
+# --------------------------------------------------
+# Money (whole centavos, so running totals never drift)
+# --------------------------------------------------
+def to_cents(amount):
+    return int((Decimal(str(amount)) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    # Plain number for orders/JSON: an int when whole, else exact to the centavo
+    return cents // 100 if cents % 100 == 0 else cents / 100
+
+
+def line_total(line):
+    return from_cents(to_cents(line["price"]) * line["quantity"])
+
+
+def format_money(amount):
+    cents = to_cents(amount)
+    return str(cents // 100) if cents % 100 == 0 else f"{cents / 100:.2f}"
+
+
+# --------------------------------------------------
+# Cart (lines keyed by SKU, totals kept up to date on every change)
+# --------------------------------------------------
+class Cart:
+    def __init__(self):
+        self.lines = {}      # sku -> {"name", "price", "quantity"}; price is snapshotted on first add
+        self.count = 0
+        self.subtotal_cents = 0
+
+    @property
+    def subtotal(self):
+        return from_cents(self.subtotal_cents)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def add(self, sku, name, price, quantity=1):
+        line = self.lines.get(sku)
+        if line is None:
+            line = self.lines[sku] = {"name": name, "price": price, "quantity": 0}
+        line["quantity"] += quantity
+        self.count += quantity
+        self.subtotal_cents += to_cents(line["price"]) * quantity
+
+    def decrement(self, sku, quantity=1):
+        line = self.lines.get(sku)
+        if line is None:
+            return
+        if quantity >= line["quantity"]:
+            self.remove(sku)
+            return
+        line["quantity"] -= quantity
+        self.count -= quantity
+        self.subtotal_cents -= to_cents(line["price"]) * quantity
+
+    def remove(self, sku):
+        line = self.lines.pop(sku, None)
+        if line is not None:
+            self.count -= line["quantity"]
+            self.subtotal_cents -= to_cents(line["price"]) * line["quantity"]
+
+    def clear(self):
+        self.lines.clear()
+        self.count = 0
+        self.subtotal_cents = 0
+
+    def items(self):
+        return self.lines.items()
+
+    def line_items(self):
+        # Snapshot used for orders: one dict per line
+        return [{"sku": sku, **line} for sku, line in self.lines.items()]
+
+    # --- compact form: [[sku, name, price, quantity], ...] ---
+    def to_compact(self):
+        return [[sku, l["name"], l["price"], l["quantity"]] for sku, l in self.lines.items()]
+
+    @classmethod
+    def from_compact(cls, data):
+        cart = cls()
+        if isinstance(data, dict):
+            # Carts saved before SKUs: {name: {"price", "quantity"}}
+            data = [[name, name, l["price"], l["quantity"]] for name, l in data.items()]
+        for sku, name, price, quantity in data or ():
+            cart.add(sku, name, price, quantity)
+        return cart
+
+
+# --------------------------------------------------
+# Cart persistence (cart id lives in the URL, cart in the store)
+# --------------------------------------------------
+# The ?cart= id is a bearer token: anyone holding the URL can read, change and
+# check out that cart. It survives reloads only; checkout moves the session to a
+# new id (rotate_cart_id), so a copied or leaked link stops following the customer.
+def get_cart_id():
+    if "cart_id" not in st.session_state:
+        st.session_state.cart_id = st.query_params.get("cart") or uuid.uuid4().hex
+    if st.query_params.get("cart") != st.session_state.cart_id:
+        st.query_params["cart"] = st.session_state.cart_id
+    return st.session_state.cart_id
+
+
+def rotate_cart_id():
+    st.session_state.cart_id = uuid.uuid4().hex
+    st.query_params["cart"] = st.session_state.cart_id
+
+
+def init_cart():
+    cart_id = get_cart_id()
+    if "cart" not in st.session_state:
+        st.session_state.cart = Cart.from_compact(get_store().load_cart(cart_id))
+    return st.session_state.cart
+
+
+def save_cart():
+    get_store().save_cart(get_cart_id(), st.session_state.cart.to_compact())
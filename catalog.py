@@ -0,0 +1,192 @@
+import csv
+import hashlib
+import io
+import os
+
+import numpy as np
+import streamlit as st
+
+import metrics
+
+CATALOG_PATH = os.environ.get("SWIFTBUY_CATALOG", "data/products.csv")
+FIELDS = ["sku", "name", "price", "category", "color", "feature", "description", "image"]
+CODED_FIELDS = ("category", "color", "feature")
+
+# Known values for the coded fields (shown in the shop filters, enforced on import)
+VOCABULARIES = {
+    "category": ["Bags", "Pencils", "Notebooks", "Accessories", "Electronics"],
+    "color": ["Black", "Red", "Blue", "Grey", "White", "Yellow", "Green", "Brown", "Multi"],
+    "feature": ["Durable", "Ergonomic", "Waterproof"],
+}
+
+# --------------------------------------------------
+# Price buckets shown in the "Price" filter
+# --------------------------------------------------
+PRICE_BUCKETS = {
+    "Under 50": dict(hi=50, include_hi=False),
+    "50 - 100": dict(lo=50, hi=100),
+    "Over 100": dict(lo=100, include_lo=False),
+}
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _code_dtype(size):
+    return np.int8 if size < 128 else np.int16 if size < 32768 else np.int32
+
+
+def locate(ids, product_id):
+    # Position of a product in a query result, or -1
+    hits = np.flatnonzero(ids == product_id)
+    return int(hits[0]) if len(hits) else -1
+
+
+def _price_value(x):
+    x = float(x)
+    return int(x) if x.is_integer() else x
+
+
+# --------------------------------------------------
+# Catalog (columnar, built once, shared by all sessions)
+# --------------------------------------------------
+class Catalog:
+    def __init__(self, columns, version=""):
+        self.version = version
+        self.sku = columns["sku"]
+        self.name = columns["name"]
+        self.description = columns["description"]
+        self.image = columns["image"]
+        self.price = np.asarray(columns["price"], dtype=np.float64)
+        n = len(self.price)
+
+        # Dictionary-encoded attributes: small integer codes + vocabulary
+        self.vocab = {}
+        self.vocab_codes = {}
+        self.codes = {}
+        self.postings = {}
+        for field in CODED_FIELDS:
+            vocab = {}
+            raw = [vocab.setdefault(v, len(vocab)) for v in columns[field]]
+            codes = np.asarray(raw, dtype=_code_dtype(len(vocab)))
+            self.vocab[field] = list(vocab)
+            self.vocab_codes[field] = vocab
+            self.codes[field] = codes
+
+            # Inverted index: value -> sorted array of product ids
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(vocab) + 1))
+            self.postings[field] = {
+                v: order[bounds[c]:bounds[c + 1]] for v, c in vocab.items()
+            }
+
+        # Price-sorted array for searchsorted lookups (stable, so ties keep catalog order)
+        self.price_order = np.argsort(self.price, kind="stable")
+        self.prices = self.price[self.price_order]
+        self.price_rank = np.empty(n, dtype=np.int64)
+        self.price_rank[self.price_order] = np.arange(n)
+
+        # High-to-low keeps catalog order among equal prices, like list.sort(reverse=True)
+        self.price_desc_order = np.argsort(-self.price, kind="stable")
+        self.price_desc_rank = np.empty(n, dtype=np.int64)
+        self.price_desc_rank[self.price_desc_order] = np.arange(n)
+
+    @classmethod
+    def from_rows(cls, rows, version=""):
+        columns = {f: [] for f in FIELDS}
+        for row in rows:
+            for f in FIELDS:
+                columns[f].append(row[f])
+        return cls(columns, version)
+
+    @classmethod
+    def from_csv(cls, path=CATALOG_PATH):
+        # One read, so the version always matches the rows even if the file is swapped meanwhile
+        with open(path, "rb") as f:
+            data = f.read()
+        version = hashlib.sha256(data).hexdigest()[:16]
+        return cls.from_rows(csv.DictReader(io.StringIO(data.decode("utf-8"), newline="")), version)
+
+    def __len__(self):
+        return len(self.price)
+
+    def __getitem__(self, i):
+        return {
+            "sku": self.sku[i],
+            "name": self.name[i],
+            "price": _price_value(self.price[i]),
+            "category": self.vocab["category"][self.codes["category"][i]],
+            "color": self.vocab["color"][self.codes["color"][i]],
+            "feature": self.vocab["feature"][self.codes["feature"][i]],
+            "description": self.description[i],
+            "image": self.image[i],
+        }
+
+    def price_range(self, lo=None, hi=None, include_lo=True, include_hi=True):
+        start = 0
+        end = len(self.prices)
+        if lo is not None:
+            start = int(np.searchsorted(self.prices, lo, "left" if include_lo else "right"))
+        if hi is not None:
+            end = int(np.searchsorted(self.prices, hi, "right" if include_hi else "left"))
+        return start, max(start, end)
+
+    def query(self, category=None, color=None, feature=None, price=None, sort="new", within=None):
+        # within: optional candidate ids (e.g. search hits, best first); "relevance" keeps their order
+        filters = [(f, v) for f, v in (("category", category), ("color", color), ("feature", feature))
+                   if v is not None]
+
+        start, end = 0, len(self.prices)
+        if price is not None:
+            start, end = self.price_range(**PRICE_BUCKETS[price])
+
+        if within is not None:
+            # Check the candidates' own codes, so cost follows the candidate count
+            ids = np.asarray(within, dtype=np.int64)
+            for field, value in filters:
+                code = self.vocab_codes[field].get(value)
+                ids = ids[self.codes[field][ids] == code] if code is not None else EMPTY
+            if price is not None:
+                rank = self.price_rank[ids]
+                ids = ids[(rank >= start) & (rank < end)]
+            in_price_order = False
+        elif not filters:
+            if price is None and sort == "new":
+                return np.arange(len(self))
+            ids = self.price_order[start:end]
+            in_price_order = True
+        else:
+            # Intersect posting arrays, smallest first, so cost follows the result size
+            postings = sorted((self.postings[f].get(v, EMPTY) for f, v in filters), key=len)
+            ids = postings[0]
+            for other in postings[1:]:
+                ids = np.intersect1d(ids, other, assume_unique=True)
+            if price is not None:
+                rank = self.price_rank[ids]
+                ids = ids[(rank >= start) & (rank < end)]
+            in_price_order = False
+
+        if sort == "relevance":
+            pass
+        elif sort == "price_asc":
+            if not in_price_order:
+                ids = ids[np.argsort(self.price_rank[ids], kind="stable")]
+        elif sort == "price_desc":
+            ids = ids[np.argsort(self.price_desc_rank[ids], kind="stable")]
+        elif in_price_order or within is not None:
+            ids = np.sort(ids)
+        return ids
+
+
+# --------------------------------------------------
+# Shared catalog (loaded once per file version, used by every page)
+# --------------------------------------------------
+@st.cache_resource(max_entries=2)
+def load_catalog(stamp, path=CATALOG_PATH):
+    with metrics.span("shop.catalog_load"):
+        return Catalog.from_csv(path)
+
+
+def get_catalog(path=CATALOG_PATH):
+    # catalog_io.py swaps the file in atomically; a new inode/mtime means a new catalog
+    info = os.stat(path)
+    return load_catalog((info.st_ino, info.st_mtime_ns), path)
@@ -0,0 +1,206 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+
+from catalog import CATALOG_PATH, FIELDS, VOCABULARIES, _price_value
+
+CHUNK_SIZE = 5000
+REQUIRED = ("sku", "name", "price", "category", "color", "feature")
+MAX_ERRORS = 50       # errors kept for the report; the rest are only counted
+
+
+def _format(path, fmt=None):
+    return fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+
+
+# --------------------------------------------------
+# Streaming readers / writers
+# --------------------------------------------------
+def read_rows(path, fmt=None):
+    # Yields (line number, row) one at a time, so memory does not grow with the file
+    if _format(path, fmt) == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield n, json.loads(line)
+                    except ValueError as e:
+                        yield n, {"_error": f"bad JSON: {e}"}
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            for n, row in enumerate(csv.DictReader(f), 2):
+                yield n, row
+
+
+def chunked(rows, size=CHUNK_SIZE):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _Writer:
+    def __init__(self, f, fmt):
+        self.f = f
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(f, FIELDS, lineterminator="\n")
+            self.csv.writeheader()
+
+    def write_chunk(self, rows):
+        if self.fmt == "csv":
+            self.csv.writerows(rows)
+        else:
+            self.f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+
+
+# --------------------------------------------------
+# Validation
+# --------------------------------------------------
+def validate(row):
+    # Returns (clean row, None) or (None, reason)
+    if not isinstance(row, dict):
+        return None, f"expected an object, got {type(row).__name__}"
+    if "_error" in row:
+        return None, row["_error"]
+    if None in row:
+        # csv.DictReader files cells past the header under the None key
+        return None, f"{len(row[None])} extra column(s)"
+    clean = {f: str(row.get(f) if row.get(f) is not None else "").strip() for f in FIELDS}
+    missing = [f for f in REQUIRED if not clean[f]]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    try:
+        price = float(clean["price"])
+    except ValueError:
+        return None, f"bad price {clean['price']!r}"
+    if not (math.isfinite(price) and price >= 0):
+        return None, f"bad price {clean['price']!r}"
+    clean["price"] = str(_price_value(price))
+    for field, values in VOCABULARIES.items():
+        if clean[field] not in values:
+            return None, f"unknown {field} {clean[field]!r}"
+    return clean, None
+
+
+# --------------------------------------------------
+# Import (validate -> dedupe -> temp file -> atomic swap)
+# --------------------------------------------------
+def import_catalog(src, dest=CATALOG_PATH, fmt=None, chunk_size=CHUNK_SIZE, merge=False,
+                   dry_run=False, progress=None):
+    # merge=True keeps existing SKUs that the import does not mention (imported rows come first).
+    # The first row for a SKU wins; later ones are reported as duplicates.
+    report = {"read": 0, "written": 0, "invalid": 0, "duplicates": 0, "kept": 0, "errors": []}
+    seen = set()
+
+    def accept(chunk):
+        rows = []
+        for n, row in chunk:
+            report["read"] += 1
+            clean, error = validate(row)
+            if error is None and clean["sku"] in seen:
+                report["duplicates"] += 1
+                error = f"duplicate sku {clean['sku']}"
+            elif error is None:
+                seen.add(clean["sku"])
+                rows.append(clean)
+                continue
+            else:
+                report["invalid"] += 1
+            if len(report["errors"]) < MAX_ERRORS:
+                report["errors"].append(f"{src}:{n}: {error}")
+        return rows
+
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            out = _Writer(f, "csv")
+            for chunk in chunked(read_rows(src, fmt), chunk_size):
+                rows = accept(chunk)
+                out.write_chunk(rows)
+                report["written"] += len(rows)
+                if progress:
+                    progress(report)
+
+            if merge and os.path.exists(dest):
+                for chunk in chunked(read_rows(dest, "csv"), chunk_size):
+                    rows = [r for _, r in chunk if r["sku"] not in seen]
+                    out.write_chunk(rows)
+                    report["kept"] += len(rows)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        if not report["written"] + report["kept"]:
+            raise ValueError("no valid rows; catalog left unchanged")
+        if not dry_run:
+            # Readers see the old file or the new one, never a partial catalog
+            os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return report
+
+
+# --------------------------------------------------
+# Export
+# --------------------------------------------------
+def export_catalog(dest, src=CATALOG_PATH, fmt=None, chunk_size=CHUNK_SIZE):
+    count = 0
+    with open(dest, "w", newline="", encoding="utf-8") as f:
+        out = _Writer(f, _format(dest, fmt))
+        for chunk in chunked(read_rows(src, "csv"), chunk_size):
+            out.write_chunk([{k: r[k] for k in FIELDS} for _, r in chunk])
+            count += len(chunk)
+    return count
+
+
+# --------------------------------------------------
+# CLI: python catalog_io.py import|export FILE
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import/export of the product catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="validate FILE and swap it in as the catalog")
+    imp.add_argument("file")
+    imp.add_argument("--merge", action="store_true", help="keep existing SKUs not in FILE")
+    imp.add_argument("--dry-run", action="store_true", help="validate only")
+
+    exp = sub.add_parser("export", help="write the catalog to FILE")
+    exp.add_argument("file")
+
+    for p in (imp, exp):
+        p.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+        p.add_argument("--catalog", default=CATALOG_PATH)
+        p.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        n = export_catalog(args.file, args.catalog, args.format, args.chunk_size)
+        print(f"exported {n} products to {args.file}")
+        return 0
+
+    try:
+        report = import_catalog(
+            args.file, args.catalog, args.format, args.chunk_size, args.merge, args.dry_run,
+            progress=lambda r: print(f"  {r['read']} read, {r['written']} valid", file=sys.stderr),
+        )
+    except ValueError as e:
+        print(f"import failed: {e}", file=sys.stderr)
+        return 1
+    for error in report["errors"]:
+        print(error, file=sys.stderr)
+    print(f"{'checked' if args.dry_run else 'imported'} {report['written']} products"
+          f" ({report['kept']} kept, {report['invalid']} invalid, {report['duplicates']} duplicates)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import pytest
+
+from storage import SQLiteStorage
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A fresh SQLite file per test, same backend the app runs on
+    return SQLiteStorage(str(tmp_path / "swiftbuy.db"))
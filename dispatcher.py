@@ -0,0 +1,134 @@
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from datetime import timedelta
+
+import streamlit as st
+
+import metrics
+from ticket_queue import aging_key
+from ticket_store import OPEN_STATUSES, get_ticket_repo
+
+# --------------------------------------------------
+# Settings
+# --------------------------------------------------
+AGENTS = {"Arce": 10, "Kath": 10, "Dennis": 10, "Clark": 10}     # agent -> max open tickets
+SLA_MINUTES = {5: 30, 4: 60, 3: 120, 2: 240, 1: 480}            # severity -> minutes to resolve
+TICK_SECONDS = float(os.environ.get("SWIFTBUY_DISPATCH_INTERVAL", "0"))  # 0 = only on demand
+
+log = logging.getLogger("swiftbuy.dispatch")
+
+
+# --------------------------------------------------
+# SLA
+# --------------------------------------------------
+def sla_deadline(ticket):
+    minutes = SLA_MINUTES.get(ticket["severity"], max(SLA_MINUTES.values()))
+    return ticket["created_at"] + timedelta(minutes=minutes)
+
+
+def sla_breached(ticket, now):
+    return ticket["status"] in OPEN_STATUSES and now > sla_deadline(ticket)
+
+
+# --------------------------------------------------
+# Dispatcher (highest priority ticket -> least loaded agent)
+# --------------------------------------------------
+class Dispatcher:
+    def __init__(self, repo, agents=AGENTS):
+        self.repo = repo
+        self.agents = dict(agents)
+        self._lock = threading.Lock()
+
+    def loads(self):
+        # Open tickets per agent, including agents no longer on the roster
+        loads = {a: 0 for a in self.agents}
+        for t in self.repo.by_status("Assigned"):
+            loads[t["agent"]] = loads.get(t["agent"], 0) + 1
+        return loads
+
+    def _free_agents(self, loads, limit=None):
+        # Min-heap of (load, agent) over agents with room left
+        heap = [(load, agent) for agent, load in loads.items()
+                if agent in self.agents and load < self._cap(agent, limit)]
+        heapq.heapify(heap)
+        return heap
+
+    def _cap(self, agent, limit):
+        return self.agents[agent] if limit is None else min(self.agents[agent], limit)
+
+    def _fill(self, tickets, heap, limit=None):
+        # tickets in priority order; O(m log k) for m tickets placed over k agents
+        plan = []
+        for t in tickets:
+            if not heap:
+                break
+            load, agent = heapq.heappop(heap)
+            plan.append((t["id"], agent))
+            if load + 1 < self._cap(agent, limit):
+                heapq.heappush(heap, (load + 1, agent))
+        return plan
+
+    def plan(self):
+        # Pending tickets come off the priority index lazily, so a pass touches
+        # only as many tickets as there is free capacity
+        return self._fill(self.repo.by_status("Pending"), self._free_agents(self.loads()))
+
+    def dispatch(self):
+        with self._lock, metrics.span("tickets.dispatch"):
+            self.repo.sync()
+            plan = self.plan()
+            # A ticket resolved or assigned elsewhere since the sync is left alone
+            written = set(self.repo.assign_many(plan, {i: {"status": "Pending"} for i, _ in plan}))
+        return [(i, a) for i, a in plan if i in written]
+
+    def rebalance(self):
+        # Moves the lowest priority tickets off agents above the even share
+        # (or off the roster) onto the least loaded agents; leftovers go back to Pending
+        with self._lock, metrics.span("tickets.rebalance"):
+            self.repo.sync()
+            held = {}
+            for t in self.repo.by_status("Assigned"):
+                held.setdefault(t["agent"], []).append(t)
+            loads = {a: len(held.get(a, ())) for a in self.agents}
+            total = sum(len(ts) for ts in held.values())
+            share = math.ceil(total / len(self.agents)) if self.agents else 0
+
+            moving, was = [], {}
+            for agent, ts in held.items():
+                keep = self._cap(agent, share) if agent in self.agents else 0
+                moving.extend(ts[keep:])     # ts is highest priority first
+                was.update((t["id"], agent) for t in ts[keep:])
+                loads[agent] = min(len(ts), keep)
+            moving.sort(key=aging_key)
+
+            plan = self._fill(moving, self._free_agents(loads, share))
+            placed = {ticket_id for ticket_id, _ in plan}
+            plan += [(t["id"], None) for t in moving if t["id"] not in placed]
+            plan = [(i, a) for i, a in plan if was[i] != a]
+            # Only tickets still assigned to the agent they were planned from are moved
+            written = set(self.repo.assign_many(
+                plan, {i: {"status": "Assigned", "agent": was[i]} for i, _ in plan}))
+        return [(i, a) for i, a in plan if i in written]
+
+    # --- background tick ---
+    def start(self, interval):
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dispatch()
+                except Exception:
+                    log.exception("dispatch tick failed")
+        threading.Thread(target=run, name="ticket-dispatch", daemon=True).start()
+
+
+@st.cache_resource
+def get_dispatcher():
+    dispatcher = Dispatcher(get_ticket_repo())
+    if TICK_SECONDS:
+        dispatcher.start(TICK_SECONDS)
+    return dispatcher
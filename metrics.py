@@ -0,0 +1,165 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+# --------------------------------------------------
+# Settings (off unless SWIFTBUY_METRICS=1)
+# --------------------------------------------------
+ENABLED = os.environ.get("SWIFTBUY_METRICS") == "1"
+JSONL_PATH = os.environ.get("SWIFTBUY_METRICS_JSONL", "metrics/reruns.jsonl")
+PROM_PATH = os.environ.get("SWIFTBUY_METRICS_PROM", "metrics/swiftbuy.prom")
+
+_NULL = contextlib.nullcontext()
+_local = threading.local()       # the rerun running on this script thread
+_lock = threading.Lock()
+_stages = {}                     # stage -> [count, total seconds, max seconds]
+_counters = {}                   # counter -> total
+_gauges = {}                     # gauge -> last value
+
+
+# --------------------------------------------------
+# Spans and counters
+# --------------------------------------------------
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    # Disabled spans are a shared no-op context manager
+    return _Span(name) if ENABLED else _NULL
+
+
+def count(name, n=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+    rerun = getattr(_local, "counters", None)
+    if rerun is not None:
+        rerun[name] = rerun.get(name, 0) + n
+
+
+def gauge(name, value):
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[name] = value
+    rerun = getattr(_local, "gauges", None)
+    if rerun is not None:
+        rerun[name] = value
+
+
+def cache_lookup(cache, hit):
+    count(f"{cache}_{'hits' if hit else 'misses'}")
+
+
+def _record(name, seconds):
+    with _lock:
+        stage = _stages.setdefault(name, [0, 0.0, 0.0])
+        stage[0] += 1
+        stage[1] += seconds
+        stage[2] = max(stage[2], seconds)
+    rerun = getattr(_local, "spans", None)
+    if rerun is not None:
+        rerun[name] = rerun.get(name, 0.0) + seconds
+
+
+# --------------------------------------------------
+# Per-rerun lifecycle
+# --------------------------------------------------
+def start_rerun(page):
+    if not ENABLED:
+        return
+    _local.page = page
+    _local.spans = {}
+    _local.counters = {}
+    _local.gauges = {}
+    _local.start = time.perf_counter()
+
+
+@contextlib.contextmanager
+def rerun(page):
+    # Wraps a page body, so reruns that end in st.rerun(), st.stop() or an error
+    # are still recorded and exported (the panel needs the page to run to the end)
+    start_rerun(page)
+    try:
+        yield
+    except BaseException:
+        finish_rerun(panel=False)
+        raise
+    finish_rerun()
+
+
+def finish_rerun(panel=True):
+    # Records the whole rerun, exports, and shows the debug panel
+    if not ENABLED or getattr(_local, "spans", None) is None:
+        return
+    page = _local.page
+    _record(f"{page}.rerun", time.perf_counter() - _local.start)
+    latest = {"ts": time.time(), "page": page, "spans": dict(_local.spans),
+              "counters": dict(_local.counters), "gauges": dict(_local.gauges)}
+    _local.spans = _local.counters = _local.gauges = None
+
+    _export(latest)
+    if panel:
+        # After st.stop()/st.rerun() the session is off limits, so only here
+        st.session_state.debug_latest = latest
+        _panel(latest)
+
+
+def _export(latest):
+    with _lock:
+        for path in (JSONL_PATH, PROM_PATH):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(JSONL_PATH, "a") as f:
+            f.write(json.dumps(latest, separators=(",", ":")) + "\n")
+
+        lines = ["# TYPE swiftbuy_stage_seconds summary"]
+        for name, (n, total, worst) in sorted(_stages.items()):
+            lines.append(f'swiftbuy_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'swiftbuy_stage_seconds_count{{stage="{name}"}} {n}')
+            lines.append(f'swiftbuy_stage_seconds_max{{stage="{name}"}} {worst:.6f}')
+        lines.append("# TYPE swiftbuy_events_total counter")
+        for name, total in sorted(_counters.items()):
+            lines.append(f'swiftbuy_events_total{{event="{name}"}} {total}')
+        lines.append("# TYPE swiftbuy_gauge gauge")
+        for name, value in sorted(_gauges.items()):
+            lines.append(f'swiftbuy_gauge{{name="{name}"}} {value}')
+        tmp = f"{PROM_PATH}.tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, PROM_PATH)
+
+
+def _panel(latest):
+    with _lock:
+        # Other sessions add stages and counters concurrently
+        total = _stages.get(f"{latest['page']}.rerun")
+        total = list(total) if total else None
+        counters = sorted(_counters.items())
+    with st.sidebar:
+        with st.expander("⏱️ Debug: rerun timings", expanded=False):
+            for name, seconds in sorted(latest["spans"].items(), key=lambda kv: -kv[1]):
+                st.write(f"`{name}` {seconds * 1000:.1f} ms")
+            if total:
+                st.caption(f"Rerun avg {total[1] / total[0] * 1000:.1f} ms over {total[0]} reruns")
+            for name, n in counters:
+                st.write(f"`{name}` {n}")
+            for name, value in sorted(latest["gauges"].items()):
+                st.write(f"`{name}` {value:,}")
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+import metrics
+from cart import format_money, line_total
+from storage import get_store
+
+WORKERS = 4
+JOB_TTL = 3600          # seconds a finished job stays queryable in memory
+RETRIES = 5             # attempts per post-order step (receipt, notify)
+RETRY_DELAY = 2         # seconds before the first retry; doubles after each failure
+
+log = logging.getLogger("swiftbuy.orders")
+
+
+# --------------------------------------------------
+# Receipt
+# --------------------------------------------------
+def render_receipt(order):
+    lines = [
+        f"### 🧾 Order Receipt #{order['order_id']}",
+        f"**Name:** {order['name']}",
+        f"**Email:** {order['email']}",
+        f"**Phone:** {order['phone']}",
+        f"**Address:** {order['address']}",
+        f"**Payment:** {order['payment']}",
+        f"**Date:** {order['date']}",
+        "#### Items Purchased:",
+        "\n".join(f"- {l['name']} x {l['quantity']} = ₱{format_money(line_total(l))}" for l in order["items"]),
+        f"### 💰 Total Paid: ₱{format_money(order['total'])}",
+    ]
+    return "\n\n".join(lines)
+
+
+# --------------------------------------------------
+# Notifications (stub + local fake)
+# --------------------------------------------------
+class Notifier(ABC):
+    @abstractmethod
+    def send(self, order, receipt):
+        raise NotImplementedError
+
+
+class FakeNotifier(Notifier):
+    # Keeps the last messages in memory instead of emailing/texting the customer
+    def __init__(self, keep=200):
+        self.sent = deque(maxlen=keep)
+
+    def send(self, order, receipt):
+        self.sent.append({"order_id": order["order_id"], "to": order["email"] or order["phone"],
+                          "receipt": receipt, "at": time.time()})
+        log.info("order %s confirmation queued for %s", order["order_id"], order["email"] or order["phone"])
+
+
+# --------------------------------------------------
+# Order Pipeline (idempotent submit, background post-order steps)
+# --------------------------------------------------
+class OrderPipeline:
+    def __init__(self, store, notifier=None, workers=WORKERS):
+        self.store = store
+        self.notifier = notifier or FakeNotifier()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orders")
+        self.jobs = {}          # idempotency key -> job
+        self._lock = threading.Lock()
+
+    def submit(self, key, order):
+        # The same key always maps to the same job, so double submits are no-ops.
+        # Only a job whose order was never saved can be started again (the store still dedupes).
+        with self._lock:
+            job = self.jobs.get(key)
+            if job is not None and job["status"] != "failed":
+                return job
+            self._prune()
+            job = self.jobs[key] = {"key": key, "status": "queued", "order": order, "receipt": None,
+                                    "error": None, "receipt_error": None, "notify_error": None,
+                                    "steps": ["receipt", "notify"], "attempts": 0, "finished_at": None}
+        self.executor.submit(self._process, job)
+        return job
+
+    def status(self, key):
+        return self.jobs.get(key)
+
+    def _process(self, job):
+        job["status"] = "processing"
+        try:
+            with metrics.span("orders.persist"):
+                # The store dedupes on the key too, so retries across processes stay single
+                self.store.add_order(job["order"], job["key"])
+        except Exception as e:
+            log.exception("order %s failed", job["key"])
+            job["error"] = str(e)
+            job["status"] = "failed"
+            job["finished_at"] = time.time()
+            return
+        # The order exists from here on; later steps are retried, never rolled back
+        job["status"] = "placed"
+        self._follow_up(job)
+
+    def _follow_up(self, job):
+        while job["steps"]:
+            step = job["steps"][0]
+            job["attempts"] += 1
+            try:
+                with metrics.span(f"orders.{step}"):
+                    getattr(self, f"_{step}")(job)
+                job[f"{step}_error"] = None
+            except Exception as e:
+                job[f"{step}_error"] = str(e)
+                if job["attempts"] < RETRIES:
+                    log.warning("order %s %s failed (attempt %d), retrying: %s",
+                                job["order"]["order_id"], step, job["attempts"], e)
+                    timer = threading.Timer(RETRY_DELAY * 2 ** (job["attempts"] - 1),
+                                            self.executor.submit, (self._follow_up, job))
+                    timer.daemon = True
+                    timer.start()
+                    return
+                log.error("order %s %s failed %d times, giving up", job["order"]["order_id"], step, RETRIES)
+            job["steps"].pop(0)
+            job["attempts"] = 0
+        job["finished_at"] = time.time()
+
+    def _receipt(self, job):
+        job["receipt"] = job["receipt"] or render_receipt(job["order"])
+        self.store.save_receipt(job["order"]["order_id"], job["receipt"])
+
+    def _notify(self, job):
+        self.notifier.send(job["order"], job["receipt"] or render_receipt(job["order"]))
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL
+        for key in [k for k, j in self.jobs.items() if j["finished_at"] and j["finished_at"] < cutoff]:
+            del self.jobs[key]
+
+
+@st.cache_resource
+def get_order_pipeline():
+    return OrderPipeline(get_store())
+
+
+# --------------------------------------------------
+# Receipts (stored with the order, cached per process)
+# --------------------------------------------------
+@st.cache_data(max_entries=1000, show_spinner=False)
+def get_receipt(order_id):
+    # Receipts never change, so every re-render after the first is a cache hit.
+    # Orders placed before receipts were stored get one rendered on first view.
+    metrics.count("receipt_cache_misses")
+    store = get_store()
+    receipt = store.get_receipt(order_id)
+    if receipt is None:
+        order = store.get_order(order_id)
+        if order is None:
+            raise KeyError(order_id)    # not cached, so the id can still appear later
+        receipt = render_receipt(order)
+        store.save_receipt(order_id, receipt)
+    return receipt
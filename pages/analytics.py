@@ -0,0 +1,62 @@
+import streamlit as st
+from datetime import datetime, timedelta
+import metrics
+import retention
+from cart import format_money
+from sales_analytics import get_sales, get_sales_analytics
+from theme import setup_page
+
+setup_page("Sales Analytics", "checkout")
+with metrics.rerun("analytics"):
+
+    st.title("📈 Sales Analytics")
+
+    # --- Rollups (kept up to date order by order; only new orders are read) ---
+    sales = get_sales()
+
+    if st.button("🔄 Rebuild from order log"):
+        sales = get_sales_analytics().rebuild()
+        st.success(f"Rebuilt from {sales.orders} orders.")
+
+    if not sales.orders:
+        st.info("No orders yet! Place an order from the checkout page to see sales.")
+        st.stop()
+
+    # --- Totals ---
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Orders", sales.orders)
+    m2.metric("Revenue", f"₱{format_money(sales.revenue)}")
+    m3.metric("Units Sold", sales.units)
+    m4.metric("Avg Order", f"₱{format_money(sales.revenue / sales.orders)}")
+
+    # --- Top products ---
+    st.subheader(f"🏆 Top {sales.top_n} Products")
+    st.dataframe(
+        [{"Product": name, "Revenue": revenue, "Units": units} for name, revenue, units in sales.top_products()],
+        hide_index=True, use_container_width=True
+    )
+
+    # --- By category / payment ---
+    c1, c2 = st.columns(2)
+    for col, dimension, label in ((c1, "category", "Category"), (c2, "payment", "Payment Method")):
+        with col:
+            st.subheader(f"By {label}")
+            cells = sales.breakdown(dimension)
+            st.bar_chart({label: [k for k, _, _ in cells], "Revenue": [r for _, r, _ in cells]}, x=label, y="Revenue")
+
+    # --- Over time (fixed number of buckets, however long the history) ---
+    now = datetime.now()
+    hours = [(now - timedelta(hours=h)).strftime("%Y-%m-%d %H") for h in range(23, -1, -1)]
+    days = [(now - timedelta(days=d)).strftime("%Y-%m-%d") for d in range(13, -1, -1)]
+
+    t1, t2 = st.columns(2)
+    with t1:
+        st.subheader("Last 24 Hours")
+        st.line_chart({"Hour": [h[11:] + ":00" for h in hours],
+                       "Revenue": [c[0] for c in sales.series("hour", hours)]}, x="Hour", y="Revenue")
+    with t2:
+        st.subheader("Last 14 Days")
+        st.bar_chart({"Day": [d[5:] for d in days],
+                      "Revenue": [c[0] for c in sales.series("day", days)]}, x="Day", y="Revenue")
+
+    retention.enforce_budget()
@@ -1,165 +1,130 @@
 import streamlit as st
+import uuid
 from datetime import datetime
-
-st.set_page_config(page_title="Checkout", layout="wide")
-
-# -------------------------------
-# Theme State (sync with shopping.py)
-# -------------------------------
-if "theme" not in st.session_state:
-    st.session_state.theme = "Light"
-
-with st.sidebar:
-    st.markdown("## 🎨 Theme")
-    theme_choice = st.radio("Mode", ["Light", "Dark"],
-        index=0 if st.session_state.theme == "Light" else 1)
-
-if theme_choice != st.session_state.theme:
-    st.session_state.theme = theme_choice
-    st.rerun()
-
-# -------------------------------
-# Apply Theme & Button Style (including hover)
-# -------------------------------
-if st.session_state.theme == "Light":
-    st.markdown("""
-    <style>
-    .stApp { background: linear-gradient(135deg, #f8fafc, #eef2ff); color: #0f172a; }
-    h1,h2,h3,p,div,label { color:#0f172a !important; }
-
-    /* Buttons style */
-    .stButton>button, .stButton button { 
-        background: linear-gradient(135deg,#4f46e5,#7c3aed) !important; 
-        color:white !important; 
-        border-radius:12px !important; 
-        font-weight:600 !important; 
-        padding: 8px 18px !important;
-        border: none !important;
-        box-shadow: 0 5px 15px rgba(0,0,0,0.2) !important;
-        transition: all 0.3s ease !important; /* smooth hover transition */
-    }
-
-    /* Hover effect */
-    .stButton>button:hover, .stButton button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.35) !important;
-        filter: brightness(1.1);
-        cursor: pointer;
-    }
-
-    .receipt-card { background:white; padding:20px; border-radius:16px; box-shadow:0 10px 25px rgba(0,0,0,0.1); margin-bottom:20px;}
-    </style>
-    """, unsafe_allow_html=True)
-else:
-    st.markdown("""
-    <style>
-    .stApp { background: linear-gradient(135deg, #020617, #0f172a); color: #e5e7eb; }
-    h1,h2,h3,p,div,label { color:#e5e7eb !important; }
-
-    /* Buttons style */
-    .stButton>button, .stButton button { 
-        background: linear-gradient(135deg,#7c3aed,#a78bfa) !important; 
-        color:white !important; 
-        border-radius:12px !important; 
-        font-weight:600 !important; 
-        padding: 8px 18px !important;
-        border: none !important;
-        box-shadow: 0 5px 15px rgba(0,0,0,0.4) !important;
-        transition: all 0.3s ease !important;
-    }
-
-    /* Hover effect */
-    .stButton>button:hover, .stButton button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.6) !important;
-        filter: brightness(1.1);
-        cursor: pointer;
-    }
-
-    .receipt-card { background:#0f172a; padding:20px; border-radius:16px; box-shadow:0 10px 25px rgba(0,0,0,0.6); margin-bottom:20px;}
-    </style>
-    """, unsafe_allow_html=True)
-
+from cart import format_money, init_cart, line_total, rotate_cart_id, save_cart
+import metrics
+import retention
+from orders import get_order_pipeline, render_receipt
+from theme import setup_page
 
 # -------------------------------
-# Page Title
+# Page Config & Theme (shared with shopping.py)
 # -------------------------------
-st.title("🧾 Checkout")
-
-# -------------------------------
-# Check Cart
-# -------------------------------
-if "cart" not in st.session_state or not st.session_state.cart:
-    st.warning("Your cart is empty. Go back to shop first.")
-    st.stop()
-
-# -------------------------------
-# Customer Form
-# -------------------------------
-st.subheader("📋 Customer Information")
-with st.form("checkout_form"):
-    col1, col2 = st.columns(2)
-    with col1:
-        name = st.text_input("Full Name")
-        email = st.text_input("Email Address")
-        phone = st.text_input("Phone Number")
-    with col2:
-        address = st.text_area("Delivery Address")
-        payment = st.selectbox("Payment Method", ["Cash on Delivery", "GCash", "Credit/Debit Card"])
+setup_page("Checkout", "checkout")
+with metrics.rerun("checkout"):
+
+    # -------------------------------
+    # Page Title
+    # -------------------------------
+    st.title("🧾 Checkout")
+
+    # -------------------------------
+    # Check Cart
+    # -------------------------------
+    cart = init_cart()
+    pipeline = get_order_pipeline()
+    if "checkout_key" not in st.session_state:
+        st.session_state.checkout_key = uuid.uuid4().hex  # one per order attempt; repeats are ignored
+
+    # -------------------------------
+    # Order Status (saved, receipted and notified in the background)
+    # -------------------------------
+    @st.fragment(run_every=1)
+    def order_status(key):
+        job = pipeline.status(key)
+        if job is None or job["status"] in ("placed", "failed"):
+            st.rerun()
+        st.info("⏳ Placing your order...")
+
+    pending = st.session_state.get("pending_order")
+    job = pending and pipeline.status(pending)
+    if pending and job and job["status"] not in ("placed", "failed"):
+        order_status(pending)
+    elif pending:
+        del st.session_state.pending_order
+        # Every finished attempt gets a new key; whether it saved an order is settled by the store,
+        # since the job may have failed after the commit or been pruned from memory
+        st.session_state.checkout_key = uuid.uuid4().hex
+        if job and job["status"] == "placed":
+            order, receipt = job["order"], job["receipt"]
+        else:
+            order, receipt = pipeline.store.get_order_by_key(pending), None
+        if order is not None:
+            retention.remember_order(order)  # compact ref; the order itself is in the store
+            st.success("🎉 Order placed successfully!")
+            st.balloons()
+
+            # -------------------------------
+            # Beautiful Receipt Card (styled)
+            # -------------------------------
+            st.markdown("<div class='receipt-card'>", unsafe_allow_html=True)
+            st.markdown(receipt or render_receipt(order))
+            st.markdown("</div>", unsafe_allow_html=True)
+        elif job:
+            # Nothing was saved: put the items back so the customer can try again
+            for line in job["order"]["items"]:
+                cart.add(line["sku"], line["name"], line["price"], line["quantity"])
+            save_cart()
+            st.error(f"Your order could not be placed: {job['error']}. Please try again.")
+        else:
+            st.error("Your last order was not saved. Please add the items again and place a new order.")
+
+    if not cart:
+        if not pending:
+            st.warning("Your cart is empty. Go back to shop first.")
+        st.stop()
+
+    # -------------------------------
+    # Customer Form
+    # -------------------------------
+    st.subheader("📋 Customer Information")
+    with st.form("checkout_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            name = st.text_input("Full Name")
+            email = st.text_input("Email Address")
+            phone = st.text_input("Phone Number")
+        with col2:
+            address = st.text_area("Delivery Address")
+            payment = st.selectbox("Payment Method", ["Cash on Delivery", "GCash", "Credit/Debit Card"])
     
-    # ✅ Styled submit button inside form
-    submitted = st.form_submit_button("✅ Place Order")
-
-# -------------------------------
-# Order Summary
-# -------------------------------
-st.subheader("🛒 Order Summary")
-total = 0
-for item, info in st.session_state.cart.items():
-    st.write(f"**{item}** x {info['quantity']} = ₱{info['price']*info['quantity']}")
-    total += info['price']*info['quantity']
-st.markdown(f"### 💰 Total: ₱{total}")
-
-# -------------------------------
-# Place Order
-# -------------------------------
-if submitted:
-    if not name or not address or not phone:
-        st.error("Please complete all required fields.")
-    else:
-        if "orders" not in st.session_state:
-            st.session_state.orders = []
-
-        order = {
-            "order_id": len(st.session_state.orders)+1,
-            "name": name,
-            "email": email,
-            "phone": phone,
-            "address": address,
-            "payment": payment,
-            "items": st.session_state.cart,
-            "total": total,
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-
-        st.session_state.orders.append(order)
-        st.session_state.cart = {}
-        st.success("🎉 Order placed successfully!")
-        st.balloons()
-
-        # -------------------------------
-        # Beautiful Receipt Card (styled)
-        # -------------------------------
-        st.markdown("<div class='receipt-card'>", unsafe_allow_html=True)
-        st.markdown(f"### 🧾 Order Receipt #{order['order_id']}")
-        st.write(f"**Name:** {order['name']}")
-        st.write(f"**Email:** {order['email']}")
-        st.write(f"**Phone:** {order['phone']}")
-        st.write(f"**Address:** {order['address']}")
-        st.write(f"**Payment:** {order['payment']}")
-        st.write(f"**Date:** {order['date']}")
-        st.markdown("#### Items Purchased:")
-        for item, info in order['items'].items():
-            st.write(f"- {item} x {info['quantity']} = ₱{info['price']*info['quantity']}")
-        st.markdown(f"### 💰 Total Paid: ₱{order['total']}")
-        st.markdown("</div>", unsafe_allow_html=True)
+        # ✅ Styled submit button inside form
+        submitted = st.form_submit_button("✅ Place Order")
+
+    # -------------------------------
+    # Order Summary
+    # -------------------------------
+    st.subheader("🛒 Order Summary")
+    for sku, info in cart.items():
+        st.write(f"**{info['name']}** x {info['quantity']} = ₱{format_money(line_total(info))}")
+    total = cart.subtotal
+    st.markdown(f"### 💰 Total: ₱{format_money(total)}")
+
+    # -------------------------------
+    # Place Order
+    # -------------------------------
+    if submitted:
+        if not name or not address or not phone:
+            st.error("Please complete all required fields.")
+        else:
+            with metrics.span("checkout.place_order"):
+                order = {
+                    "name": name,
+                    "email": email,
+                    "phone": phone,
+                    "address": address,
+                    "payment": payment,
+                    "items": cart.line_items(),
+                    "total": total,
+                    "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+
+                # Returns right away; a double submit reuses the same key and job
+                pipeline.submit(st.session_state.checkout_key, order)
+                st.session_state.pending_order = st.session_state.checkout_key
+                cart.clear()
+                save_cart()
+                rotate_cart_id()   # the old ?cart= link now only opens an empty cart
+            st.rerun()
+
+    retention.enforce_budget()
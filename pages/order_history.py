@@ -0,0 +1,115 @@
+import hmac
+import os
+import streamlit as st
+import metrics
+import retention
+from cart import format_money
+from orders import get_receipt
+from storage import get_store
+from theme import setup_page
+
+STAFF_KEY = os.environ.get("SWIFTBUY_STAFF_KEY")  # unset = store-wide lookups are off
+
+# Checkout styles include the receipt card
+setup_page("Order History", "checkout")
+with metrics.rerun("orders"):
+
+    st.title("📜 Order History")
+
+    PAGE_SIZE = 20
+    store = get_store()
+
+    # --- Staff unlock (customers only ever see the orders placed in their own session) ---
+    if STAFF_KEY and not st.session_state.get("staff"):
+        with st.sidebar:
+            key = st.text_input("🔑 Staff key", type="password")
+        if key and hmac.compare_digest(key, STAFF_KEY):
+            st.session_state.staff = True
+            st.rerun()
+
+    # --- Lookup (order # by primary key; email/phone through their own indexes) ---
+    if st.session_state.get("staff"):
+        l1, l2 = st.columns([1, 3])
+        with l1:
+            lookup_by = st.selectbox("Look up by", ["My Orders", "All Orders", "Order #", "Email", "Phone"],
+                                     key="history_by")
+        with l2:
+            lookup = st.text_input("Search", key="history_lookup", disabled=lookup_by in ("My Orders", "All Orders"),
+                                   placeholder="Order number, email address or phone number").strip()
+    else:
+        lookup_by, lookup = "My Orders", ""
+
+    # The cursor stack of (page, last id before it) resets whenever the lookup changes.
+    # retention.enforce_budget may thin out the middle of a long stack.
+    query = (lookup_by, lookup)
+    if st.session_state.get("history_query") != query:
+        st.session_state.history_query = query
+        st.session_state.history_cursors = [(1, None)]
+        st.session_state.receipt_open = None
+
+    # --- Fetch one page (keyset: order_id < last id of the previous page) ---
+    cursors = st.session_state.history_cursors
+    page, before = cursors[-1]
+    with metrics.span("orders.page"):
+        if lookup_by == "My Orders":
+            # Compact refs kept by checkout, newest first; each order is read back by primary key
+            refs = [r for r in reversed(st.session_state.get("orders", []))
+                    if before is None or r.order_id < before]
+            orders = [o for o in (r.load() for r in refs[:PAGE_SIZE + 1]) if o]
+        elif lookup_by == "Order #":
+            # isdecimal (not isdigit) so "²" is not a number; ids beyond SQLite's range cannot exist
+            number = lookup.lstrip("#")
+            order_id = int(number) if number.isdecimal() and len(number) <= 18 else None
+            order = store.get_order(order_id) if order_id is not None else None
+            orders = [order] if order else []
+        elif lookup_by != "All Orders" and not lookup:
+            orders = []
+        else:
+            orders = store.list_orders(
+                before=before, limit=PAGE_SIZE + 1,
+                email=lookup if lookup_by == "Email" else None,
+                phone=lookup if lookup_by == "Phone" else None,
+            )
+    has_older = len(orders) > PAGE_SIZE
+    orders = orders[:PAGE_SIZE]
+
+    if not orders:
+        if lookup:
+            st.info("No orders found.")
+        elif lookup_by == "My Orders":
+            st.info("You have no orders in this session yet. Place one from the checkout page.")
+        else:
+            st.info("No orders yet! Place an order from the checkout page.")
+
+    # --- Orders ---
+    for order in orders:
+        units = sum(line["quantity"] for line in order["items"])
+        o1, o2 = st.columns([5, 1])
+        with o1:
+            st.markdown(f"**#{order['order_id']}** · {order['date']} · {order['name']} · "
+                        f"{units} item{'s' if units != 1 else ''} · **₱{format_money(order['total'])}** · {order['payment']}")
+        with o2:
+            if st.button("🧾 Receipt", key=f"receipt-{order['order_id']}", use_container_width=True):
+                opened = st.session_state.receipt_open
+                st.session_state.receipt_open = None if opened == order["order_id"] else order["order_id"]
+                st.rerun()
+        if st.session_state.receipt_open == order["order_id"]:
+            with metrics.span("orders.receipt"):
+                st.markdown("<div class='receipt-card'>", unsafe_allow_html=True)
+                st.markdown(get_receipt(order["order_id"]))
+                st.markdown("</div>", unsafe_allow_html=True)
+
+    # --- Pagination ---
+    p1, p2, p3 = st.columns([4, 1, 1])
+    with p1:
+        st.caption(f"Page {page}")
+    with p2:
+        if st.button("◀ Newer", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with p3:
+        if st.button("Older ▶", disabled=not has_older, use_container_width=True):
+            cursors.append((page + 1, orders[-1]["order_id"]))
+            st.rerun()
+
+    retention.enforce_budget()
@@ -1,98 +1,122 @@
 import streamlit as st
-from queue import PriorityQueue
 from datetime import datetime
+import metrics
+import retention
+from dispatcher import get_dispatcher, sla_breached, sla_deadline
+from ticket_store import get_ticket_repo
 
 st.set_page_config(page_title="Support Tickets", layout="wide")
-
-# --- Initialize tickets ---
-if "tickets" not in st.session_state:
-    st.session_state.tickets = []
-
-# --- Priority function ---
-def compute_priority(ticket):
-    severity_weight = 0.7
-    time_weight = 0.3
-    waiting_minutes = (datetime.now() - ticket["created_at"]).total_seconds() / 60
-    return -(severity_weight * ticket["severity"] + time_weight * (waiting_minutes / 60))
-
-st.title("🛎️ Support Ticket Queue System")
-
-if not st.session_state.tickets:
-    st.info("No tickets yet! Add products from the shop to generate tickets.")
-    st.stop()
-
-# --- Prepare ticket queue ---
-pq = PriorityQueue()
-for t in st.session_state.tickets:
-    if t.get("status") != "Resolved":  # optional: hide resolved from queue
-        pq.put((compute_priority(t), t))
-
-ticket_list = []
-while not pq.empty():
-    _, t = pq.get()
-    waiting_time = int((datetime.now() - t["created_at"]).total_seconds() / 60)
-    ticket_list.append({
-        "id": t["id"],
-        "product": t["product_name"],
-        "severity": t["severity"],
-        "waiting": waiting_time,
-        "status": t.get("status", "Pending"),
-        "agent": t.get("agent")
-    })
-
-# --- Filters ---
-filter_status = st.selectbox("Filter tickets", ["All", "Pending", "Assigned", "Resolved"])
-
-if filter_status != "All":
-    ticket_list = [t for t in ticket_list if t["status"] == filter_status]
-
-agents = ["Arce", "Kath", "Dennis", "Clark"]
-
-# --- Display tickets ---
-for ticket in ticket_list:
-
-    st.markdown(f"## 🎫 Ticket #{ticket['id']} — {ticket['product']}")
-    st.write(f"**Severity:** {ticket['severity']} | **Waiting:** {ticket['waiting']} min")
-    st.write(f"**Status:** {ticket['status']} | **Agent:** {ticket['agent'] or 'Unassigned'}")
-
-    # Priority indicator
-    if ticket["severity"] >= 4:
-        st.error("🔴 High Priority")
-    elif ticket["severity"] >= 2:
-        st.warning("🟡 Medium Priority")
-    else:
-        st.success("🟢 Low Priority")
-
-    col1, col2, col3 = st.columns(3)
-
-    # --- Assign ---
-    with col1:
-        selected_agent = st.selectbox(
-            "Assign agent", agents, key=f"agent-{ticket['id']}"
-        )
-        if st.button("Assign", key=f"assign-{ticket['id']}"):
-            for t in st.session_state.tickets:
-                if t["id"] == ticket["id"]:
-                    t["agent"] = selected_agent
-                    t["status"] = "Assigned"
+with metrics.rerun("tickets"):
+
+    # --- Initialize tickets ---
+    tickets = get_ticket_repo()
+
+    st.title("🛎️ Support Ticket Queue System")
+
+    if not len(tickets):
+        st.info("No tickets yet! Add products from the shop to generate tickets.")
+        st.stop()
+
+    # --- Dispatcher (highest priority tickets go to the least loaded agent) ---
+    dispatcher = get_dispatcher()
+    loads = dispatcher.loads()
+    d1, d2, d3 = st.columns([4, 1, 1])
+    with d1:
+        st.caption("**Agent load:** " + " · ".join(f"{a} {loads.get(a, 0)}/{cap}" for a, cap in dispatcher.agents.items()))
+    with d2:
+        if st.button("⚡ Auto-assign", key="dispatch"):
+            dispatcher.dispatch()
             st.rerun()
-
-    # --- Resolve ---
-    with col2:
-        if st.button("Resolve", key=f"resolve-{ticket['id']}"):
-            for t in st.session_state.tickets:
-                if t["id"] == ticket["id"]:
-                    t["status"] = "Resolved"
-            st.success("✅ Ticket resolved!")
+    with d3:
+        if st.button("⚖️ Rebalance", key="rebalance"):
+            dispatcher.rebalance()
             st.rerun()
 
-    # --- Delete ---
-    with col3:
-        if st.button("Delete", key=f"delete-{ticket['id']}"):
-            st.session_state.tickets = [
-                t for t in st.session_state.tickets if t["id"] != ticket["id"]
-            ]
-            st.warning("🗑️ Ticket deleted")
+    # --- Filters (read straight from the status index, already in priority order) ---
+    filter_status = st.selectbox("Filter tickets", ["All", "Pending", "Assigned", "Resolved"])
+
+    if filter_status == "All":
+        queue = tickets.open_tickets()
+    else:
+        queue = tickets.by_status(filter_status)
+
+    with metrics.span("tickets.queue_build"):
+        ticket_list = []
+        now = datetime.now()
+        for t in queue:
+            waiting_time = int((now - t["created_at"]).total_seconds() / 60)
+            ticket_list.append({
+                "id": t["id"],
+                "product": t["product_name"],
+                "severity": t["severity"],
+                "waiting": waiting_time,
+                "status": t.get("status", "Pending"),
+                "agent": t.get("agent"),
+                "due": sla_deadline(t),
+                "breached": sla_breached(t, now)
+            })
+
+    agents = list(dispatcher.agents)
+
+    # --- Display tickets ---
+    for ticket in ticket_list:
+
+        st.markdown(f"## 🎫 Ticket #{ticket['id']} — {ticket['product']}")
+        st.write(f"**Severity:** {ticket['severity']} | **Waiting:** {ticket['waiting']} min")
+        st.write(f"**Status:** {ticket['status']} | **Agent:** {ticket['agent'] or 'Unassigned'}")
+        if ticket["status"] != "Resolved":
+            st.write(f"**SLA:** {'⏰ breached' if ticket['breached'] else 'due'} {ticket['due']:%H:%M}")
+
+        # Priority indicator
+        if ticket["severity"] >= 4:
+            st.error("🔴 High Priority")
+        elif ticket["severity"] >= 2:
+            st.warning("🟡 Medium Priority")
+        else:
+            st.success("🟢 Low Priority")
+
+        col1, col2, col3 = st.columns(3)
+
+        # --- Assign ---
+        with col1:
+            selected_agent = st.selectbox(
+                "Assign agent", agents, key=f"agent-{ticket['id']}"
+            )
+            if st.button("Assign", key=f"assign-{ticket['id']}"):
+                tickets.assign(ticket["id"], selected_agent)
+                st.rerun()
+
+        # --- Resolve ---
+        with col2:
+            if st.button("Resolve", key=f"resolve-{ticket['id']}"):
+                tickets.resolve(ticket["id"])
+                st.success("✅ Ticket resolved!")
+                st.rerun()
+
+        # --- Delete ---
+        with col3:
+            if st.button("Delete", key=f"delete-{ticket['id']}"):
+                tickets.delete(ticket["id"])
+                st.warning("🗑️ Ticket deleted")
+                st.rerun()
+
+        st.markdown("---")
+
+    # --- Archive (old resolved tickets live only in the store; paged in on request) ---
+    if filter_status == "Resolved" and tickets.archived:
+        archive_pages = st.session_state.get("archive_pages", 0)
+        before = None
+        for _ in range(archive_pages):
+            rows = tickets.resolved_archive(before)
+            for t in rows:
+                st.write(f"📦 #{t['id']} — {t['product_name']} · Severity {t['severity']} · {t['agent'] or 'Unassigned'}")
+            if not rows:
+                break
+            before = rows[-1]["rev"]
+        if st.button("Show older resolved tickets", key="archive-more"):
+            st.session_state.archive_pages = archive_pages + 1
             st.rerun()
 
-    st.markdown("---")
+    metrics.gauge("tickets_in_memory", len(tickets))
+    metrics.gauge("tickets_archived", tickets.archived)
+    retention.enforce_budget()
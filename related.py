@@ -0,0 +1,106 @@
+import heapq
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+
+K = 4                 # related products shown per card
+PRICE_WINDOW = 32     # same-category neighbours considered on each side, in price order
+CO_WEIGHT = 1.5       # per log(1 + times bought together)
+CHUNK = 8192          # products scored at once by attribute_neighbors
+
+
+# --------------------------------------------------
+# Attribute neighbours (same category, close in price, shared color/feature)
+# --------------------------------------------------
+def attribute_neighbors(catalog, m, window=PRICE_WINDOW, chunk=CHUNK):
+    # Top-m candidates per product as (ids, scores) arrays of shape (n, m); -1 pads short rows.
+    # Only the window around each product in (category, price) order is scored: O(n * window),
+    # chunk rows at a time, so temporaries stay O(chunk * window) whatever the catalog size.
+    n = len(catalog)
+    top_ids = np.full((n, m), -1, dtype=np.int32)
+    top_scores = np.full((n, m), -np.inf, dtype=np.float32)
+    if n == 0:
+        return top_ids, top_scores
+    category, color, feature = (catalog.codes[f] for f in ("category", "color", "feature"))
+    order = np.lexsort((catalog.price, category))
+    cat, col, feat = category[order], color[order], feature[order]
+    log_price = np.log1p(catalog.price[order]).astype(np.float32)
+    offsets = np.array([d for d in range(-window, window + 1) if d], dtype=np.int64)
+    width = min(m, len(offsets))
+
+    for start in range(0, n, chunk):
+        here = np.arange(start, min(start + chunk, n))
+        there = here[:, None] + offsets                       # (rows, 2 * window) positions
+        ok = (there >= 0) & (there < n)
+        np.clip(there, 0, n - 1, out=there)
+        ok &= cat[there] == cat[here, None]
+        scores = ((col[there] == col[here, None]).astype(np.float32) + (feat[there] == feat[here, None])
+                  + 1 - np.minimum(np.abs(log_price[there] - log_price[here, None]), 1))
+        scores[~ok] = -np.inf
+        ids = np.where(ok, order[there], -1).astype(np.int32)
+
+        if len(offsets) > width:
+            top = np.argpartition(-scores, width - 1, axis=1)[:, :width]
+            ids = np.take_along_axis(ids, top, axis=1)
+            scores = np.take_along_axis(scores, top, axis=1)
+        best = np.argsort(-scores, axis=1, kind="stable")
+        top_ids[order[here], :width] = np.take_along_axis(ids, best, axis=1)
+        top_scores[order[here], :width] = np.take_along_axis(scores, best, axis=1)
+    return top_ids, top_scores
+
+
+# --------------------------------------------------
+# Related Index (attribute neighbours + co-purchases, top-k per product)
+# --------------------------------------------------
+class RelatedIndex:
+    def __init__(self, catalog, k=K):
+        self.k = k
+        self.sku_id = {sku: i for i, sku in enumerate(catalog.sku)}
+        self.attr_ids, self.attr_scores = attribute_neighbors(catalog, 2 * k)
+        self.co = {}             # sku -> Counter(other sku -> orders containing both)
+        self.related = {}        # product id -> ids; only products with co-purchases
+        self.last_order_id = 0
+        self._lock = threading.Lock()
+
+    def get(self, product_id):
+        ids = self.related.get(product_id)
+        if ids is None:
+            ids = [int(j) for j in self.attr_ids[product_id][:self.k] if j >= 0]
+        return ids
+
+    def for_sku(self, sku):
+        i = self.sku_id.get(sku)
+        return [] if i is None else self.get(i)
+
+    def apply(self, order):
+        # O(items^2) counter updates, then only the touched products are re-ranked
+        skus = {line.get("sku") for line in order["items"]} & self.sku_id.keys()
+        for a in skus:
+            counts = self.co.setdefault(a, Counter())
+            for b in skus:
+                if b != a:
+                    counts[b] += 1
+        if len(skus) > 1:
+            for a in skus:
+                self._refresh(a)
+        self.last_order_id = max(self.last_order_id, order.get("order_id", 0))
+
+    def _refresh(self, sku):
+        i = self.sku_id[sku]
+        scores = {int(j): float(s) for j, s in zip(self.attr_ids[i], self.attr_scores[i]) if j >= 0}
+        for other, n in heapq.nlargest(2 * self.k, self.co[sku].items(), key=lambda kv: kv[1]):
+            j = self.sku_id[other]
+            scores[j] = scores.get(j, 0.0) + CO_WEIGHT * math.log1p(n)
+        self.related[i] = [j for j, _ in heapq.nlargest(self.k, scores.items(), key=lambda kv: kv[1])]
+
+    def sync(self, store):
+        # Folds in orders placed since the last sync, by any process
+        with self._lock:
+            while True:
+                orders = store.orders_since(self.last_order_id)
+                for order in orders:
+                    self.apply(order)
+                if not orders:
+                    return self
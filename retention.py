@@ -0,0 +1,106 @@
+import logging
+import os
+import sys
+
+import streamlit as st
+
+import metrics
+from storage import get_store
+
+# --------------------------------------------------
+# Settings
+# --------------------------------------------------
+SESSION_BUDGET = int(os.environ.get("SWIFTBUY_SESSION_BUDGET", str(64 * 1024)))  # bytes of droppable state per session
+ORDERS_KEPT = 20        # recent orders remembered per session (as OrderRef), listed as "My Orders"
+
+log = logging.getLogger("swiftbuy.retention")
+
+
+# --------------------------------------------------
+# Compact order record (the full order stays in the store)
+# --------------------------------------------------
+class OrderRef:
+    __slots__ = ("order_id", "date", "total", "units")
+
+    def __init__(self, order_id, date, total, units):
+        self.order_id = order_id
+        self.date = date
+        self.total = total
+        self.units = units
+
+    @classmethod
+    def from_order(cls, order):
+        return cls(order["order_id"], order["date"], order["total"],
+                   sum(line["quantity"] for line in order["items"]))
+
+    def load(self):
+        # Pages the full order back in when it is actually viewed
+        return get_store().get_order(self.order_id)
+
+
+def remember_order(order):
+    orders = st.session_state.setdefault("orders", [])
+    orders.append(OrderRef.from_order(order))
+    del orders[:-ORDERS_KEPT]
+
+
+# --------------------------------------------------
+# Session size
+# --------------------------------------------------
+def deep_sizeof(obj, seen=None):
+    # Approximate bytes reachable from obj (containers, __dict__ and __slots__)
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, s), seen) for s in obj.__slots__ if hasattr(obj, s))
+    return size
+
+
+def session_bytes(keys=None):
+    keys = list(st.session_state.keys()) if keys is None else [k for k in keys if k in st.session_state]
+    return sum(deep_sizeof(st.session_state[k]) for k in keys)
+
+
+# --------------------------------------------------
+# Budget (only state that grows and can be rebuilt is charged; the cart and
+# "My Orders" are the customer's and are never trimmed)
+# --------------------------------------------------
+def _drop(key):
+    del st.session_state[key]
+    return True
+
+
+def _trim_cursors(key):
+    # Keeps page 1 and the current page; the "◀ Newer" trail between them loses its older half
+    cursors = st.session_state[key]
+    n = (len(cursors) - 1) // 2
+    del cursors[1:1 + n]
+    return n > 0
+
+
+TRIMMABLE = (
+    ("debug_latest", _drop),              # metrics panel data, recorded again next rerun
+    ("history_cursors", _trim_cursors),   # one entry per "Older ▶" click on the order history page
+)
+
+
+def enforce_budget():
+    keys = [key for key, _ in TRIMMABLE]
+    used = session_bytes(keys)
+    for key, trim in TRIMMABLE:
+        while used > SESSION_BUDGET and key in st.session_state and trim(key):
+            used = session_bytes(keys)
+    if used > SESSION_BUDGET:
+        log.warning("droppable session state uses %d bytes, over the %d byte budget", used, SESSION_BUDGET)
+    total = session_bytes()
+    metrics.gauge("session_bytes", total)
+    return total
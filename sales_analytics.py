@@ -0,0 +1,161 @@
+import heapq
+import threading
+
+import streamlit as st
+
+import metrics
+from cart import from_cents, to_cents
+from catalog import get_catalog
+from storage import get_store
+
+TOP_N = 10
+DIMENSIONS = ("product", "category", "payment", "hour", "day")
+
+
+# --------------------------------------------------
+# Top-N (bounded min-heap; values only ever grow)
+# --------------------------------------------------
+class TopN:
+    def __init__(self, n=TOP_N):
+        self.n = n
+        self.members = {}    # key -> value for the current top n
+        self._heap = []      # (value, key); entries go stale as members grow
+
+    def offer(self, key, value):
+        if key in self.members or len(self.members) < self.n:
+            self.members[key] = value
+            heapq.heappush(self._heap, (value, key))
+            if len(self._heap) > 4 * self.n:
+                self._heap = [(v, k) for k, v in self.members.items()]
+                heapq.heapify(self._heap)
+            return
+        floor_value, floor_key = self._floor()
+        if value > floor_value:
+            heapq.heapreplace(self._heap, (value, key))
+            del self.members[floor_key]
+            self.members[key] = value
+
+    def _floor(self):
+        while self._heap[0][0] != self.members.get(self._heap[0][1]):
+            heapq.heappop(self._heap)
+        return self._heap[0]
+
+    def items(self):
+        return sorted(self.members.items(), key=lambda kv: -kv[1])
+
+
+# --------------------------------------------------
+# Sales rollups (updated per order, O(items))
+# --------------------------------------------------
+class SalesRollup:
+    def __init__(self, categories=None, top_n=TOP_N):
+        self.categories = categories or {}     # sku -> category
+        self.top_n = top_n
+        self.reset()
+
+    def reset(self):
+        self.last_order_id = 0
+        self.orders = 0
+        self.revenue_cents = 0
+        self.units = 0
+        self.by = {d: {} for d in DIMENSIONS}  # dimension -> key -> [revenue in centavos, units]
+        self.names = {}                        # sku -> product name
+        self.top = TopN(self.top_n)            # sku by revenue
+
+    @property
+    def revenue(self):
+        return from_cents(self.revenue_cents)
+
+    def _add(self, dimension, key, revenue, units):
+        cell = self.by[dimension].get(key)
+        if cell is None:
+            cell = self.by[dimension][key] = [0, 0]
+        cell[0] += revenue
+        cell[1] += units
+        return cell
+
+    def apply(self, order):
+        date = order["date"]             # "YYYY-MM-DD HH:MM:SS"
+        units = sum(line["quantity"] for line in order["items"])
+        total = to_cents(order["total"])     # integer centavos, so sums never drift
+        self.orders += 1
+        self.revenue_cents += total
+        self.units += units
+        self._add("payment", order["payment"], total, units)
+        self._add("hour", date[:13], total, units)
+        self._add("day", date[:10], total, units)
+        for line in order["items"]:
+            sku = line.get("sku", line["name"])
+            revenue = to_cents(line["price"]) * line["quantity"]
+            self.names[sku] = line["name"]
+            cell = self._add("product", sku, revenue, line["quantity"])
+            self._add("category", self.categories.get(sku, "Other"), revenue, line["quantity"])
+            self.top.offer(sku, cell[0])
+        self.last_order_id = max(self.last_order_id, order.get("order_id", 0))
+
+    def set_categories(self, categories):
+        # Regroups the category totals from the per-product ones, so no replay is needed
+        self.categories = categories
+        self.by["category"] = {}
+        for sku, (revenue, units) in self.by["product"].items():
+            self._add("category", categories.get(sku, "Other"), revenue, units)
+
+    def top_products(self):
+        return [(self.names[sku], from_cents(revenue), self.by["product"][sku][1])
+                for sku, revenue in self.top.items()]
+
+    def breakdown(self, dimension):
+        # (key, revenue, units) for every key of a dimension, highest revenue first
+        cells = sorted(self.by[dimension].items(), key=lambda kv: -kv[1][0])
+        return [(key, from_cents(revenue), units) for key, (revenue, units) in cells]
+
+    def series(self, dimension, keys):
+        # [revenue, units] for the given bucket keys, zero where nothing sold
+        cells = self.by[dimension]
+        return [[from_cents(c[0]), c[1]] for c in (cells.get(k, [0, 0]) for k in keys)]
+
+
+# --------------------------------------------------
+# Shared analytics (one per process, tails the orders table)
+# --------------------------------------------------
+class SalesAnalytics:
+    def __init__(self, store):
+        self.store = store
+        self.rollup = SalesRollup()
+        self.catalog_version = None
+        self._lock = threading.Lock()
+
+    def use_catalog(self, catalog):
+        # SKU -> category follows the shop's catalog; only a new version re-reads it
+        with self._lock:
+            if catalog.version != self.catalog_version:
+                self.rollup.set_categories({catalog.sku[i]: catalog[i]["category"] for i in range(len(catalog))})
+                self.catalog_version = catalog.version
+
+    def sync(self):
+        # Applies only orders placed since the last sync, by any process
+        with self._lock:
+            while True:
+                orders = self.store.orders_since(self.rollup.last_order_id)
+                for order in orders:
+                    self.rollup.apply(order)
+                if not orders:
+                    return self.rollup
+
+    def rebuild(self):
+        # Replays the whole order log from scratch
+        with self._lock:
+            self.rollup.reset()
+        return self.sync()
+
+
+@st.cache_resource
+def get_sales_analytics():
+    return SalesAnalytics(get_store())
+
+
+def get_sales():
+    analytics = get_sales_analytics()
+    analytics.use_catalog(get_catalog())     # same cached catalog as the shop
+    with metrics.span("analytics.sync"):
+        return analytics.sync()
@@ -0,0 +1,123 @@
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+
+TOKEN = re.compile(r"[a-z0-9]+")
+K1 = 1.2
+B = 0.75
+NAME_BOOST = 2          # name tokens count twice, so title matches rank first
+MAX_EXPANSIONS = 32     # terms a trailing prefix can expand to
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+# --------------------------------------------------
+# Search Index (built once per catalog version)
+# --------------------------------------------------
+class SearchIndex:
+    def __init__(self, catalog):
+        postings = {}
+        lengths = np.zeros(len(catalog), dtype=np.int32)
+        for i, (name, description) in enumerate(zip(catalog.name, catalog.description)):
+            tf = Counter(tokenize(description))
+            for term in tokenize(name):
+                tf[term] += NAME_BOOST
+            lengths[i] = sum(tf.values())
+            for term, n in tf.items():
+                postings.setdefault(term, []).append((i, n))
+
+        # Sorted term dictionary for prefix lookups; postings as (ids, tf) arrays
+        self.terms = sorted(postings)
+        self.ids = {}
+        self.tf = {}
+        for term in self.terms:
+            ids, tf = zip(*postings.pop(term))
+            self.ids[term] = np.asarray(ids, dtype=np.int64)
+            self.tf[term] = np.asarray(tf, dtype=np.float32)
+
+        self.lengths = lengths
+        self.avgdl = float(lengths.mean()) if len(lengths) else 0.0
+        self.n = len(lengths)
+
+    def df(self, term):
+        return len(self.ids.get(term, ()))
+
+    def _prefix_range(self, prefix):
+        start = bisect_left(self.terms, prefix)
+        return self.terms[start:bisect_left(self.terms, prefix + "\uffff", start)]
+
+    def expand(self, prefix, limit=MAX_EXPANSIONS):
+        # Terms starting with prefix, most common first
+        terms = self._prefix_range(prefix)
+        if len(terms) > limit:
+            terms = heapq.nlargest(limit, terms, key=self.df)
+        return terms
+
+    def suggest(self, text, k=8):
+        # Completes the last token with terms that still match something together with the
+        # earlier ones, ranked by how many of their hits they keep
+        tokens = tokenize(text)
+        if not tokens or text[-1:].isspace():
+            return []
+        head = " ".join(tokens[:-1])
+        if not head:
+            return self.expand(tokens[-1], k)
+        hits = np.zeros(self.n, dtype=bool)
+        hits[self._exact_hits(tokens[:-1])] = True
+        counts = {t: int(hits[self.ids[t]].sum()) for t in self._prefix_range(tokens[-1])}
+        best = heapq.nlargest(k, (t for t, n in counts.items() if n), key=counts.get)
+        return [f"{head} {t}" for t in best]
+
+    def _exact_hits(self, tokens):
+        # Ids containing every token (no prefix matching)
+        ids = None
+        for token in tokens:
+            if token not in self.ids:
+                return np.empty(0, dtype=np.int64)
+            ids = self.ids[token] if ids is None else np.intersect1d(ids, self.ids[token], assume_unique=True)
+        return ids
+
+    def _bm25(self, term, ids):
+        idf = np.log(1 + (self.n - len(ids) + 0.5) / (len(ids) + 0.5))
+        tf = self.tf[term]
+        norm = tf + K1 * (1 - B + B * self.lengths[ids] / self.avgdl)
+        return idf * tf * (K1 + 1) / norm
+
+    def _token_scores(self, terms):
+        # Sorted ids matching any of the terms, with their summed BM25 scores
+        if len(terms) == 1:
+            ids = self.ids[terms[0]]
+            return ids, self._bm25(terms[0], ids)
+        ids = np.concatenate([self.ids[t] for t in terms])
+        scores = np.concatenate([self._bm25(t, self.ids[t]) for t in terms])
+        ids, inverse = np.unique(ids, return_inverse=True)
+        return ids, np.bincount(inverse, weights=scores)
+
+    def search(self, text):
+        # Every token must match; the last one also matches as a prefix (typeahead).
+        # Returns ids ordered by BM25 score; cost follows the posting lists touched.
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        ids = scores = None
+        for pos, token in enumerate(tokens):
+            terms = [token] if token in self.ids else []
+            if pos == len(tokens) - 1 and not text[-1:].isspace():
+                terms = self.expand(token)
+            if not terms:
+                return np.empty(0, dtype=np.int64)
+
+            token_ids, token_scores = self._token_scores(terms)
+            if ids is None:
+                ids, scores = token_ids, token_scores
+            else:
+                ids, a, b = np.intersect1d(ids, token_ids, assume_unique=True, return_indices=True)
+                scores = scores[a] + token_scores[b]
+            if not len(ids):
+                break
+        return ids[np.argsort(-scores, kind="stable")]
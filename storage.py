@@ -0,0 +1,407 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+
+# --------------------------------------------------
+# Settings
+# --------------------------------------------------
+STORE_PATH = os.environ.get("SWIFTBUY_DB", "data/swiftbuy.db")
+POOL_SIZE = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequences (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO sequences (name, value) VALUES ('order', 0), ('ticket', 0), ('rev', 0);
+
+CREATE TABLE IF NOT EXISTS carts (
+    cart_id    TEXT PRIMARY KEY,
+    data       TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    order_id   INTEGER PRIMARY KEY,
+    name       TEXT NOT NULL,
+    email      TEXT,
+    phone      TEXT,
+    address    TEXT,
+    payment    TEXT,
+    items      TEXT NOT NULL,
+    total      NUMERIC NOT NULL,
+    created_at TEXT NOT NULL,
+    idempotency_key TEXT,
+    receipt    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_email ON orders (email COLLATE NOCASE, order_id);
+CREATE INDEX IF NOT EXISTS idx_orders_phone ON orders (phone, order_id);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    id           INTEGER PRIMARY KEY,
+    product_name TEXT NOT NULL,
+    severity     INTEGER NOT NULL,
+    created_at   TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    agent        TEXT,
+    rev          INTEGER NOT NULL,
+    deleted      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_rev ON tickets (rev);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_rev ON tickets (status, rev);
+"""
+
+# Columns added after a table was first shipped: table -> [(column, type)]
+MIGRATIONS = {
+    "orders": [("idempotency_key", "TEXT"), ("receipt", "TEXT")],
+}
+POST_MIGRATION = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_key ON orders (idempotency_key);
+"""
+
+TICKET_FIELDS = ("status", "agent")
+
+
+# --------------------------------------------------
+# Storage interface (carts, orders, tickets)
+# --------------------------------------------------
+class Storage(ABC):
+    @abstractmethod
+    def load_cart(self, cart_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_cart(self, cart_id, cart):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_order(self, order, key=None):
+        # With a key, resubmitting the same order returns the first order_id
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_receipt(self, order_id, receipt):
+        raise NotImplementedError
+
+    @abstractmethod
+    def orders_since(self, order_id, limit=1000):
+        # Orders with a larger id, oldest first (ids are allocated in commit order)
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_orders(self, before=None, limit=20, email=None, phone=None):
+        # Newest first, keyset-paged: pass the last order_id seen as before
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_receipt(self, order_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_order(self, order_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_order_by_key(self, key):
+        # The order saved under an idempotency key, or None if that attempt saved nothing
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_tickets(self, tickets):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_ticket(self, ticket_id, **fields):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_tickets(self, updates):
+        # updates: [(ticket_id, {field: value}[, {field: expected}]), ...], applied in one transaction.
+        # A row with expected values is only written if it still has them; returns the ids written.
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_ticket(self, ticket_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ticket_changes(self, since_rev):
+        # Tickets written after since_rev, oldest first, each with "rev" and "deleted"
+        raise NotImplementedError
+
+    @abstractmethod
+    def ticket_snapshot(self, resolved_limit):
+        # (rev, rows, resolved total): open tickets plus the newest resolved_limit resolved ones,
+        # oldest write first, as of rev; ticket_changes(rev) continues from there
+        raise NotImplementedError
+
+    @abstractmethod
+    def resolved_before(self, rev, limit=50):
+        # Resolved tickets last written before rev, newest first (keyset paging over the archive)
+        raise NotImplementedError
+
+
+# --------------------------------------------------
+# SQLite backend (WAL, pooled connections)
+# --------------------------------------------------
+class SQLiteStorage(Storage):
+    def __init__(self, path=STORE_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    def _connect(self):
+        # Autocommit mode; writes open their own BEGIN IMMEDIATE transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _migrate(self, conn):
+        for table, columns in MIGRATIONS.items():
+            have = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+            for column, kind in columns:
+                if column not in have:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+        conn.executescript(POST_MIGRATION)
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._opened < self.pool_size
+                if grow:
+                    self._opened += 1
+            conn = self._connect() if grow else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue
+        # on busy_timeout instead of failing on a read->write upgrade
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _allocate(self, conn, name, count=1):
+        # Globally unique, monotonic ids shared by every process using this file
+        conn.execute("UPDATE sequences SET value = value + ? WHERE name = ?", (count, name))
+        last = conn.execute("SELECT value FROM sequences WHERE name = ?", (name,)).fetchone()[0]
+        return range(last - count + 1, last + 1)
+
+    # --- carts ---
+    def load_cart(self, cart_id):
+        with self.connection() as conn:
+            row = conn.execute("SELECT data FROM carts WHERE cart_id = ?", (cart_id,)).fetchone()
+        return json.loads(row["data"]) if row else {}
+
+    def save_cart(self, cart_id, cart):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO carts (cart_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (cart_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (cart_id, json.dumps(cart, separators=(",", ":")), datetime.now().isoformat()),
+            )
+
+    # --- orders ---
+    def add_order(self, order, key=None):
+        with self.transaction() as conn:
+            row = key and conn.execute(
+                "SELECT order_id FROM orders WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+            if row:
+                order["order_id"] = row["order_id"]
+                return row["order_id"]
+            order_id = self._allocate(conn, "order")[0]
+            conn.execute(
+                "INSERT INTO orders (order_id, name, email, phone, address, payment, items, total, "
+                "created_at, idempotency_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (order_id, order["name"], order["email"], order["phone"], order["address"],
+                 order["payment"], json.dumps(order["items"], separators=(",", ":")),
+                 order["total"], order["date"], key),
+            )
+        order["order_id"] = order_id
+        return order_id
+
+    def get_order(self, order_id):
+        with self.connection() as conn:
+            row = conn.execute("SELECT * FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return _order_dict(row) if row else None
+
+    def get_order_by_key(self, key):
+        with self.connection() as conn:
+            row = conn.execute("SELECT * FROM orders WHERE idempotency_key = ?", (key,)).fetchone()
+        return _order_dict(row) if row else None
+
+    def save_receipt(self, order_id, receipt):
+        with self.transaction() as conn:
+            conn.execute("UPDATE orders SET receipt = ? WHERE order_id = ?", (receipt, order_id))
+
+    def list_orders(self, before=None, limit=20, email=None, phone=None):
+        # Each filter has an (x, order_id) index, so every page is an index range scan
+        where, args = [], []
+        if email:
+            where.append("email = ? COLLATE NOCASE")
+            args.append(email)
+        if phone:
+            where.append("phone = ?")
+            args.append(phone)
+        if before is not None:
+            where.append("order_id < ?")
+            args.append(before)
+        sql = "SELECT order_id, name, email, phone, address, payment, items, total, created_at FROM orders"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self.connection() as conn:
+            rows = conn.execute(sql + " ORDER BY order_id DESC LIMIT ?", (*args, limit)).fetchall()
+        return [_order_dict(r) for r in rows]
+
+    def get_receipt(self, order_id):
+        with self.connection() as conn:
+            row = conn.execute("SELECT receipt FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return row["receipt"] if row else None
+
+    def orders_since(self, order_id, limit=1000):
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT order_id, payment, items, total, created_at FROM orders "
+                "WHERE order_id > ? ORDER BY order_id LIMIT ?", (order_id, limit)
+            ).fetchall()
+        return [_order_dict(r) for r in rows]
+
+    # --- tickets ---
+    def add_tickets(self, tickets):
+        # One transaction and one executemany for the whole batch
+        tickets = list(tickets)
+        if not tickets:
+            return tickets
+        with self.transaction() as conn:
+            ids = self._allocate(conn, "ticket", len(tickets))
+            revs = self._allocate(conn, "rev", len(tickets))
+            for t, ticket_id in zip(tickets, ids):
+                t["id"] = ticket_id
+            conn.executemany(
+                "INSERT INTO tickets (id, product_name, severity, created_at, status, agent, rev) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(t["id"], t["product_name"], t["severity"], t["created_at"].isoformat(),
+                  t.get("status", "Pending"), t.get("agent"), rev)
+                 for t, rev in zip(tickets, revs)],
+            )
+        return tickets
+
+    def update_ticket(self, ticket_id, **fields):
+        self.update_tickets([(ticket_id, fields)])
+
+    def update_tickets(self, updates):
+        updates = list(updates)
+        written = []
+        if not updates:
+            return written
+        with self.transaction() as conn:
+            revs = self._allocate(conn, "rev", len(updates))   # skipped rows just leave a gap
+            for (ticket_id, fields, *expected), rev in zip(updates, revs):
+                fields = {k: v for k, v in fields.items() if k in TICKET_FIELDS}
+                expected = {k: v for k, v in (expected[0] if expected else {}).items() if k in TICKET_FIELDS}
+                assignments = "".join(f"{k} = ?, " for k in fields)
+                conditions = "".join(f" AND {k} IS ?" for k in expected)   # IS also matches NULL
+                cur = conn.execute(
+                    f"UPDATE tickets SET {assignments}rev = ? WHERE id = ? AND deleted = 0{conditions}",
+                    (*fields.values(), rev, ticket_id, *expected.values()),
+                )
+                if cur.rowcount:
+                    written.append(ticket_id)
+        return written
+
+    def delete_ticket(self, ticket_id):
+        # Soft delete, so other processes see it through ticket_changes()
+        with self.transaction() as conn:
+            rev = self._allocate(conn, "rev")[0]
+            conn.execute("UPDATE tickets SET deleted = 1, rev = ? WHERE id = ?", (rev, ticket_id))
+
+    def ticket_changes(self, since_rev):
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM tickets WHERE rev > ? ORDER BY rev", (since_rev,)
+            ).fetchall()
+        return [_ticket_dict(r) for r in rows]
+
+    def ticket_snapshot(self, resolved_limit):
+        with self.connection() as conn:
+            conn.execute("BEGIN")   # one read snapshot for the rev, the rows and the count
+            try:
+                rev = conn.execute("SELECT value FROM sequences WHERE name = 'rev'").fetchone()[0]
+                rows = conn.execute(
+                    "SELECT * FROM tickets WHERE status != 'Resolved' AND deleted = 0 "
+                    "UNION ALL SELECT * FROM (SELECT * FROM tickets WHERE status = 'Resolved' AND deleted = 0 "
+                    "ORDER BY rev DESC LIMIT ?) ORDER BY rev", (resolved_limit,)
+                ).fetchall()
+                resolved = conn.execute(
+                    "SELECT COUNT(*) FROM tickets WHERE status = 'Resolved' AND deleted = 0"
+                ).fetchone()[0]
+            finally:
+                conn.execute("COMMIT")
+        return rev, [_ticket_dict(r) for r in rows], resolved
+
+    def resolved_before(self, rev, limit=50):
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM tickets WHERE status = 'Resolved' AND deleted = 0 AND rev < ? "
+                "ORDER BY rev DESC LIMIT ?", (rev, limit)
+            ).fetchall()
+        return [_ticket_dict(r) for r in rows]
+
+
+def _order_dict(row):
+    order = dict(row)
+    order["items"] = json.loads(order["items"])
+    if isinstance(order["items"], dict):
+        # Orders placed before SKUs: {name: {"price", "quantity"}}, the name stands in for the SKU
+        order["items"] = [{"sku": name, "name": name, "price": l["price"], "quantity": l["quantity"]}
+                          for name, l in order["items"].items()]
+    order["date"] = order.pop("created_at")
+    order.pop("idempotency_key", None)
+    return order
+
+
+def _ticket_dict(row):
+    ticket = dict(row)
+    ticket["created_at"] = datetime.fromisoformat(ticket["created_at"])
+    ticket["deleted"] = bool(ticket["deleted"])
+    return ticket
+
+
+# --------------------------------------------------
+# Shared store (one per process, shared by all sessions)
+# --------------------------------------------------
+@st.cache_resource
+def get_store():
+    return SQLiteStorage()
@@ -0,0 +1,59 @@
+from cart import Cart, format_money, from_cents, line_total, to_cents
+
+
+def test_money_round_trips_through_centavos():
+    assert to_cents(19.99) == 1999
+    assert to_cents("0.1") == 10
+    assert to_cents(2.675) == 268          # half up on the decimal text, not the binary float
+    assert from_cents(2500) == 25 and isinstance(from_cents(2500), int)
+    assert from_cents(2544) == 25.44
+    assert format_money(25) == "25" and format_money(25.4) == "25.40"
+    assert line_total({"price": 0.1, "quantity": 3}) == 0.3
+
+
+def test_totals_never_drift():
+    cart = Cart()
+    cart.add("A", "Pen", 19.99)
+    cart.add("B", "Clip", 0.1)
+    cart.add("C", "Tape", 5.35)
+    assert cart.subtotal == 25.44 and cart.count == 3
+    for sku in ("A", "B", "C"):
+        cart.remove(sku)
+    assert cart.subtotal_cents == 0 and cart.subtotal == 0 and cart.count == 0 and not cart
+
+
+def test_add_decrement_remove_clear():
+    cart = Cart()
+    cart.add("A", "Pen", 12.5, quantity=3)
+    cart.add("A", "Pen (renamed)", 99, quantity=1)   # price and name stay as first added
+    assert cart.lines["A"] == {"name": "Pen", "price": 12.5, "quantity": 4}
+    assert cart.subtotal == 50
+    cart.decrement("A")
+    assert cart.lines["A"]["quantity"] == 3 and cart.subtotal == 37.5 and cart.count == 3
+    cart.decrement("A", quantity=5)                   # more than held removes the line
+    assert "A" not in cart.lines and cart.count == 0 and cart.subtotal_cents == 0
+    cart.decrement("missing")
+    cart.remove("missing")
+    cart.add("B", "Clip", 1.25, quantity=2)
+    cart.clear()
+    assert len(cart) == 0 and cart.count == 0 and cart.subtotal_cents == 0
+
+
+def test_compact_round_trip_and_line_items():
+    cart = Cart()
+    cart.add("A", "Pen", 12.5, quantity=2)
+    cart.add("B", "Clip", 0.35)
+    restored = Cart.from_compact(cart.to_compact())
+    assert restored.lines == cart.lines
+    assert restored.subtotal_cents == cart.subtotal_cents == 2535 and restored.count == 3
+    assert restored.line_items() == [
+        {"sku": "A", "name": "Pen", "price": 12.5, "quantity": 2},
+        {"sku": "B", "name": "Clip", "price": 0.35, "quantity": 1},
+    ]
+
+
+def test_from_compact_accepts_legacy_and_empty_carts():
+    legacy = Cart.from_compact({"Pen": {"price": 12.5, "quantity": 2}})
+    assert legacy.line_items() == [{"sku": "Pen", "name": "Pen", "price": 12.5, "quantity": 2}]
+    assert legacy.subtotal == 25
+    assert not Cart.from_compact(None) and not Cart.from_compact([])
@@ -0,0 +1,80 @@
+import itertools
+import random
+
+import pytest
+
+from catalog import CATALOG_PATH, FIELDS, VOCABULARIES, Catalog
+
+SORTS = {"new": None, "price_asc": False, "price_desc": True}
+
+
+# --------------------------------------------------
+# Reference: the shop's original list filter and sort
+# --------------------------------------------------
+def baseline(products, category, color, feature, price, sort):
+    def keep(p):
+        if category is not None and p["category"] != category: return False
+        if color is not None and p["color"] != color: return False
+        if feature is not None and p["feature"] != feature: return False
+        if price == "Under 50" and p["price"] >= 50: return False
+        if price == "50 - 100" and not (50 <= p["price"] <= 100): return False
+        if price == "Over 100" and p["price"] <= 100: return False
+        return True
+
+    products = [p for p in products if keep(p)]
+    if SORTS[sort] is not None:
+        products.sort(key=lambda x: x["price"], reverse=SORTS[sort])
+    return [p["sku"] for p in products]
+
+
+def synthetic(n=300, seed=7):
+    # Bucket edges and repeated prices, so ties and boundaries are exercised
+    rng = random.Random(seed)
+    prices = [49, 49.99, 50, 50.01, 99.5, 100, 100.01, 150, 300] + [rng.randint(1, 40) * 5 for _ in range(20)]
+    rows = [{"sku": f"T-{i}", "name": f"Item {i}", "price": str(rng.choice(prices)),
+             "category": rng.choice(VOCABULARIES["category"]), "color": rng.choice(VOCABULARIES["color"]),
+             "feature": rng.choice(VOCABULARIES["feature"]), "description": "", "image": ""}
+            for i in range(n)]
+    return Catalog.from_rows(rows)
+
+
+@pytest.fixture(params=["shipped", "synthetic"])
+def catalog(request):
+    return Catalog.from_csv(CATALOG_PATH) if request.param == "shipped" else synthetic()
+
+
+def combinations():
+    return itertools.product(
+        [None] + VOCABULARIES["category"], [None] + VOCABULARIES["color"], [None] + VOCABULARIES["feature"],
+        [None, "Under 50", "50 - 100", "Over 100"], list(SORTS),
+    )
+
+
+def test_query_matches_baseline_for_every_filter_combination(catalog):
+    products = [catalog[i] for i in range(len(catalog))]
+    for category, color, feature, price, sort in combinations():
+        ids = catalog.query(category=category, color=color, feature=feature, price=price, sort=sort)
+        expected = baseline(products, category, color, feature, price, sort)
+        assert [catalog.sku[i] for i in ids] == expected, (category, color, feature, price, sort)
+
+
+def test_query_within_filters_candidates_and_keeps_relevance_order(catalog):
+    rng = random.Random(3)
+    within = rng.sample(range(len(catalog)), len(catalog) // 2)
+    candidates = [catalog[i] for i in within]
+    for category, color, feature, price, _ in itertools.islice(combinations(), 0, None, 7):
+        ids = catalog.query(category=category, color=color, feature=feature, price=price,
+                            sort="relevance", within=within)
+        assert [catalog.sku[i] for i in ids] == baseline(candidates, category, color, feature, price, "new")
+
+
+def test_unknown_value_matches_nothing(catalog):
+    assert len(catalog.query(category="Toys")) == 0
+    assert len(catalog.query(color="Purple", within=range(len(catalog)))) == 0
+
+
+def test_from_rows_round_trips_fields():
+    row = {"sku": "X-1", "name": "Pen", "price": "12.5", "category": "Pencils", "color": "Blue",
+           "feature": "Durable", "description": "d", "image": "images/pen.jpg"}
+    catalog = Catalog.from_rows([row])
+    assert catalog[0] == {**{f: row[f] for f in FIELDS}, "price": 12.5}
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from dispatcher import Dispatcher
+from ticket_store import TicketRepository
+
+START = datetime(2026, 1, 5, 9, 0)
+
+
+@pytest.fixture
+def repo(store):
+    return TicketRepository(store)
+
+
+def add(repo, severities):
+    return repo.add_many({"product_name": f"P{i}", "severity": s, "created_at": START + timedelta(minutes=i)}
+                         for i, s in enumerate(severities))
+
+
+def test_dispatch_fills_least_loaded_agents_up_to_capacity(repo):
+    ids = add(repo, [1, 5, 3, 5, 2, 4, 1])
+    dispatcher = Dispatcher(repo, {"Arce": 2, "Kath": 3})
+    moves = dispatcher.dispatch()
+    assert len(moves) == 5
+    assert dispatcher.loads() == {"Arce": 2, "Kath": 3}
+    # The two oldest priority tickets wait
+    assert {t["id"] for t in repo.by_status("Pending")} == {ids[0], ids[6]}
+    assert dispatcher.dispatch() == []
+
+
+def test_dispatch_balances_loads(repo):
+    add(repo, [3] * 6)
+    dispatcher = Dispatcher(repo, {"Arce": 10, "Kath": 10, "Dennis": 10})
+    dispatcher.dispatch()
+    assert dispatcher.loads() == {"Arce": 2, "Kath": 2, "Dennis": 2}
+
+
+def test_conditional_write_skips_changed_rows(repo, store):
+    a, b, c = add(repo, [3, 3, 3])
+    store.update_ticket(b, status="Resolved")        # another process, not yet synced
+    written = repo.assign_many([(a, "Arce"), (b, "Arce"), (c, "Kath")],
+                               {a: {"status": "Pending"}, b: {"status": "Pending"}, c: {"agent": None}})
+    assert written == [a, c]
+    assert repo.get(b)["status"] == "Resolved" and repo.get(b)["agent"] is None
+    assert store.update_tickets([(c, {"agent": "Arce"}, {"agent": None})]) == []   # IS matches NULL only
+    assert store.update_tickets([(c, {"agent": "Arce"}, {"agent": "Kath"})]) == [c]
+
+
+def race(repo, monkeypatch, change):
+    # Runs change() right after the dispatcher's own sync, before it writes
+    sync = repo.sync
+    pending = [change]
+
+    def sync_then_race():
+        sync()
+        if pending:
+            pending.pop()()
+    monkeypatch.setattr(repo, "sync", sync_then_race)
+
+
+def test_dispatch_leaves_tickets_resolved_meanwhile(repo, store, monkeypatch):
+    a, b = add(repo, [5, 1])
+    race(repo, monkeypatch, lambda: store.update_ticket(a, status="Resolved"))
+    moves = Dispatcher(repo, {"Arce": 5}).dispatch()
+    assert moves == [(b, "Arce")]
+    assert repo.get(a)["status"] == "Resolved" and repo.get(a)["agent"] is None
+
+
+def test_rebalance_moves_overflow_and_skips_reassigned(repo, store, monkeypatch):
+    ids = add(repo, [3] * 6)
+    repo.assign_many([(i, "Arce") for i in ids])
+    dispatcher = Dispatcher(repo, {"Arce": 10, "Kath": 10, "Dennis": 10})
+    oldest = ids[0]      # oldest ticket ranks highest, so the newest ones move first
+    moved = ids[-1]
+    race(repo, monkeypatch, lambda: store.update_ticket(moved, agent="Clark"))
+    moves = dispatcher.rebalance()
+    assert moved not in {i for i, _ in moves}
+    assert repo.get(moved)["agent"] == "Clark"
+    assert repo.get(oldest)["agent"] == "Arce"
+    assert len(moves) == 3
+    loads = dispatcher.loads()
+    assert loads["Arce"] == 2 and loads["Clark"] == 1
+    assert sorted([loads["Kath"], loads["Dennis"]]) == [1, 2]
+
+
+def test_rebalance_returns_off_roster_tickets_to_pending(repo):
+    ids = add(repo, [2, 4])
+    repo.assign_many([(ids[0], "Clark"), (ids[1], "Clark")])
+    dispatcher = Dispatcher(repo, {"Arce": 1})
+    # The higher severity ticket takes the one free slot
+    assert dict(dispatcher.rebalance()) == {ids[1]: "Arce", ids[0]: None}
+    assert dispatcher.loads() == {"Arce": 1}
+    assert repo.count("Pending") == 1
@@ -0,0 +1,68 @@
+import random
+
+from catalog import Catalog
+from sales_analytics import SalesAnalytics, SalesRollup, TopN
+
+
+def order(order_id, items, payment="GCash", date="2026-03-02 14:05:00"):
+    return {"order_id": order_id, "name": "Ana", "email": "ana@example.com", "phone": "0917", "address": "Manila",
+            "payment": payment, "date": date, "items": items,
+            "total": round(sum(i["price"] * i["quantity"] for i in items), 2)}
+
+
+def item(sku, price, quantity=1):
+    return {"sku": sku, "name": f"Item {sku}", "price": price, "quantity": quantity}
+
+
+def test_topn_matches_brute_force():
+    rng = random.Random(5)
+    top, totals = TopN(5), {}
+    for _ in range(3000):
+        key = rng.randrange(40)
+        totals[key] = totals.get(key, 0) + rng.randint(1, 500)
+        top.offer(key, totals[key])
+        expected = sorted(totals.values(), reverse=True)[:5]
+        assert [v for _, v in top.items()] == expected
+        assert all(totals[k] == v for k, v in top.items())
+
+
+def test_rollup_sums_in_centavos():
+    rollup = SalesRollup({"A": "Pens"})
+    for i in range(1, 101):
+        rollup.apply(order(i, [item("A", 0.1), item("B", 19.99, 2)]))
+    assert rollup.revenue_cents == 100 * (10 + 3998) and rollup.revenue == 4008
+    assert rollup.orders == 100 and rollup.units == 300 and rollup.last_order_id == 100
+    assert rollup.breakdown("category") == [("Other", 3998, 200), ("Pens", 10, 100)]
+    assert rollup.top_products() == [("Item B", 3998, 200), ("Item A", 10, 100)]
+
+
+def test_set_categories_regroups_without_replay():
+    rollup = SalesRollup()
+    rollup.apply(order(1, [item("A", 10), item("B", 5.5, 2)]))
+    rollup.apply(order(2, [item("C", 1.25)], payment="Card", date="2026-03-03 09:00:00"))
+    assert rollup.breakdown("category") == [("Other", 22.25, 4)]
+    rollup.set_categories({"A": "Pens", "B": "Pens", "C": "Paper"})
+    assert rollup.breakdown("category") == [("Pens", 21, 3), ("Paper", 1.25, 1)]
+    assert rollup.breakdown("payment") == [("GCash", 21, 3), ("Card", 1.25, 1)]
+    assert rollup.series("day", ["2026-03-01", "2026-03-02", "2026-03-03"]) == [[0, 0], [21, 3], [1.25, 1]]
+    assert rollup.series("hour", ["2026-03-02 14"]) == [[21, 3]]
+
+
+def test_analytics_tails_the_store(store):
+    analytics = SalesAnalytics(store)
+    store.add_order(order(None, [item("A", 12.5, 2)]))
+    assert analytics.sync().revenue == 25
+    store.add_order(order(None, [item("B", 0.35, 3)]))
+    store.add_order(order(None, [item("A", 12.5)]))
+    rollup = analytics.sync()
+    assert rollup.orders == 3 and rollup.revenue_cents == 2500 + 105 + 1250
+    assert analytics.sync().orders == 3       # nothing new, nothing applied twice
+
+    analytics.use_catalog(Catalog.from_rows([
+        {"sku": "A", "name": "Item A", "price": "12.5", "category": "Pens", "color": "Blue",
+         "feature": "Durable", "description": "", "image": ""}], version="v1"))
+    assert analytics.rollup.breakdown("category") == [("Pens", 37.5, 3), ("Other", 1.05, 3)]
+
+    rebuilt = analytics.rebuild()
+    assert (rebuilt.orders, rebuilt.revenue_cents, rebuilt.units) == (3, 3855, 6)
+    assert rebuilt.breakdown("category") == [("Pens", 37.5, 3), ("Other", 1.05, 3)]
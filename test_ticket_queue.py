@@ -0,0 +1,74 @@
+import random
+from datetime import datetime, timedelta
+
+from ticket_queue import SEVERITY_WEIGHT, TIME_WEIGHT, TicketQueue, aging_key
+
+START = datetime(2026, 1, 5, 9, 0)
+
+
+def tickets(n, seed=11):
+    rng = random.Random(seed)
+    return [{"id": i, "severity": rng.randint(1, 5),
+             "created_at": START + timedelta(minutes=rng.randint(0, 72 * 60))} for i in range(n)]
+
+
+def priority(ticket, now):
+    # Higher is more urgent: severity plus time waited
+    hours = (now - ticket["created_at"]).total_seconds() / 3600
+    return SEVERITY_WEIGHT * ticket["severity"] + TIME_WEIGHT * hours
+
+
+def by_priority(ts, now):
+    return sorted(ts, key=lambda t: (-round(priority(t, now), 6), t["id"]))
+
+
+def by_aging_key(ts):
+    return sorted(ts, key=lambda t: (round(aging_key(t), 6), t["id"]))
+
+
+def test_aging_key_orders_like_priority_at_any_time():
+    ts = tickets(200)
+    for now in (START + timedelta(days=3), START + timedelta(days=30), START + timedelta(days=365)):
+        assert [t["id"] for t in by_aging_key(ts)] == [t["id"] for t in by_priority(ts, now)]
+
+
+def test_waiting_overtakes_severity():
+    # Four severity levels are worth 4 * 0.7 / 0.3 = 9.33 hours of waiting
+    old = {"id": 1, "severity": 1, "created_at": START}
+    new = {"id": 2, "severity": 5, "created_at": START + timedelta(hours=9)}
+    newer = {"id": 3, "severity": 5, "created_at": START + timedelta(hours=10)}
+    assert aging_key(new) < aging_key(old) < aging_key(newer)
+
+
+def test_ordered_after_pushes_and_removes():
+    ts = tickets(300)
+    queue = TicketQueue(ts[:200])
+    for t in ts[200:]:
+        queue.push(t)
+    removed = set(range(0, 300, 3))
+    for i in removed:
+        assert queue.remove(i)["id"] == i
+    assert queue.remove(0) is None
+    keep = [t for t in ts if t["id"] not in removed]
+    assert len(queue) == len(keep)
+    assert [t["id"] for t in queue.ordered()] == [t["id"] for t in by_aging_key(keep)]
+
+
+def test_push_replaces_and_compaction_keeps_order():
+    ts = tickets(150)
+    queue = TicketQueue(ts)
+    for t in ts[:100]:
+        queue.remove(t["id"])
+    assert len(queue._heap) < len(ts) - 64   # compacted once removals outnumbered live entries
+    bumped = dict(ts[120], severity=5)
+    queue.push(bumped)
+    live = [bumped if t["id"] == bumped["id"] else t for t in ts[100:]]
+    assert len(queue) == 50
+    assert [t["id"] for t in queue.ordered()] == [t["id"] for t in by_aging_key(live)]
+
+
+def test_ordered_can_stop_early():
+    queue = TicketQueue(tickets(50))
+    first = next(queue.ordered())
+    assert first["id"] == by_aging_key(tickets(50))[0]["id"]
+    assert len(queue) == 50
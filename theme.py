@@ -0,0 +1,133 @@
+import hashlib
+import re
+
+import streamlit as st
+
+THEMES = ["Light", "Dark"]
+
+# --------------------------------------------------
+# Stylesheets (page -> theme -> CSS)
+# --------------------------------------------------
+STYLES = {
+    "shop": {
+        "Light": """
+        .stApp { background: linear-gradient(135deg, #f8fafc, #eef2ff); color: #0f172a; }
+        .cols-box { background: white; border-radius: 16px; padding: 18px; box-shadow: 0 10px 25px rgba(0,0,0,0.08); transition: 0.3s; }
+        .cols-box:hover { transform: translateY(-6px); box-shadow: 0 15px 35px rgba(0,0,0,0.12); }
+        .logo { color: #4f46e5; font-size: 28px; font-weight: 800; }
+        .cart-icon { color: #0f172a; font-weight: 600; text-align:right; }
+        h1 { color: #0f172a; }
+        .stButton > button { background: linear-gradient(135deg, #4f46e5, #7c3aed); color: white; border-radius: 12px; font-weight: 600; }
+        section[data-testid="stSidebar"] { background: #0f172a; }
+        section[data-testid="stSidebar"] * { color: white; }
+        .price { color: #4f46e5; font-weight: 800; font-size: 18px; }
+        """,
+        "Dark": """
+        .stApp { background: linear-gradient(135deg, #020617, #0f172a); color: #e5e7eb; }
+        .cols-box { background: #020617; border-radius: 16px; padding: 18px; box-shadow: 0 10px 25px rgba(0,0,0,0.6); transition: 0.3s; border: 1px solid #1e293b; }
+        .cols-box:hover { transform: translateY(-6px); box-shadow: 0 15px 35px rgba(0,0,0,0.8); }
+        .logo { color: #a78bfa; font-size: 28px; font-weight: 800; }
+        .cart-icon { color: #e5e7eb; font-weight: 600; text-align:right; }
+        h1 { color: #f9fafb; }
+        .stButton > button { background: linear-gradient(135deg, #7c3aed, #a78bfa); color: white; border-radius: 12px; font-weight: 600; }
+        section[data-testid="stSidebar"] { background: #020617; border-right: 1px solid #1e293b; }
+        section[data-testid="stSidebar"] * { color: #e5e7eb; }
+        .price { color: #a78bfa; font-weight: 800; font-size: 18px; }
+        """,
+    },
+    "checkout": {
+        "Light": """
+        .stApp { background: linear-gradient(135deg, #f8fafc, #eef2ff); color: #0f172a; }
+        h1,h2,h3,p,div,label { color:#0f172a !important; }
+
+        /* Buttons style */
+        .stButton>button, .stButton button {
+            background: linear-gradient(135deg,#4f46e5,#7c3aed) !important;
+            color:white !important;
+            border-radius:12px !important;
+            font-weight:600 !important;
+            padding: 8px 18px !important;
+            border: none !important;
+            box-shadow: 0 5px 15px rgba(0,0,0,0.2) !important;
+            transition: all 0.3s ease !important; /* smooth hover transition */
+        }
+
+        /* Hover effect */
+        .stButton>button:hover, .stButton button:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 8px 25px rgba(0,0,0,0.35) !important;
+            filter: brightness(1.1);
+            cursor: pointer;
+        }
+
+        .receipt-card { background:white; padding:20px; border-radius:16px; box-shadow:0 10px 25px rgba(0,0,0,0.1); margin-bottom:20px;}
+        """,
+        "Dark": """
+        .stApp { background: linear-gradient(135deg, #020617, #0f172a); color: #e5e7eb; }
+        h1,h2,h3,p,div,label { color:#e5e7eb !important; }
+
+        /* Buttons style */
+        .stButton>button, .stButton button {
+            background: linear-gradient(135deg,#7c3aed,#a78bfa) !important;
+            color:white !important;
+            border-radius:12px !important;
+            font-weight:600 !important;
+            padding: 8px 18px !important;
+            border: none !important;
+            box-shadow: 0 5px 15px rgba(0,0,0,0.4) !important;
+            transition: all 0.3s ease !important;
+        }
+
+        /* Hover effect */
+        .stButton>button:hover, .stButton button:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 8px 25px rgba(0,0,0,0.6) !important;
+            filter: brightness(1.1);
+            cursor: pointer;
+        }
+
+        .receipt-card { background:#0f172a; padding:20px; border-radius:16px; box-shadow:0 10px 25px rgba(0,0,0,0.6); margin-bottom:20px;}
+        """,
+    },
+}
+
+
+# --------------------------------------------------
+# Compile once per process (shared by all sessions)
+# --------------------------------------------------
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+@st.cache_resource
+def compiled_css(page, theme):
+    css = minify_css(STYLES[page][theme])
+    digest = hashlib.sha256(css.encode()).hexdigest()[:12]
+    html = f"<style id='swiftbuy-{page}-{digest}'>{css}</style>"
+    return html, digest
+
+
+# --------------------------------------------------
+# Page Setup (config + theme switcher + CSS)
+# --------------------------------------------------
+def setup_page(title, page=None):
+    st.set_page_config(layout="wide", page_title=title)
+
+    if "theme" not in st.session_state:
+        st.session_state.theme = "Light"
+
+    with st.sidebar:
+        st.markdown("## 🎨 Theme")
+        theme_choice = st.radio("Mode", THEMES, index=THEMES.index(st.session_state.theme))
+
+    if theme_choice != st.session_state.theme:
+        st.session_state.theme = theme_choice
+        st.rerun()
+
+    if page is not None:
+        html, _ = compiled_css(page, st.session_state.theme)
+        st.markdown(html, unsafe_allow_html=True)
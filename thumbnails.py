@@ -0,0 +1,156 @@
+import hashlib
+import io
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import metrics
+
+# --------------------------------------------------
+# Settings
+# --------------------------------------------------
+THUMB_DIR = "static/thumbs"   # served by Streamlit at app/static/thumbs/
+STATIC_URL = "app/static/thumbs"
+THUMB_WIDTHS = (320, 640)      # card size and 2x for high-DPI screens
+CARD_WIDTH = 320
+JPEG_QUALITY = 80
+WEBP_QUALITY = 78
+LRU_SIZE = 1024                # thumbnails/URLs kept in memory per process
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def _output_format():
+    # WebP is much smaller, but not every Pillow build ships with it
+    from PIL import features
+    return "webp" if features.check("webp") else "jpg"
+
+
+def _render(path, width, fmt):
+    # PIL is only needed when a derivative is missing from the disk cache
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.width > width:
+            height = max(1, round(im.height * width / im.width))
+            im = im.resize((width, height), Image.LANCZOS)
+        im = im.convert("RGB")
+
+        buf = io.BytesIO()
+        if fmt == "webp":
+            im.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+        else:
+            im.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return buf.getvalue()
+
+
+# --------------------------------------------------
+# Thumbnail Cache (memory LRU -> disk -> PIL)
+# --------------------------------------------------
+class ThumbnailCache:
+    def __init__(self, cache_dir=THUMB_DIR, widths=THUMB_WIDTHS, max_items=LRU_SIZE, manifest=None):
+        self.cache_dir = cache_dir
+        self.manifest = manifest     # declared path -> {"path", "hash", ...} or None (see assets.py)
+        self.widths = tuple(sorted(widths))
+        self.max_items = max_items
+        self.fmt = None
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pick_width(self, width):
+        for w in self.widths:
+            if w >= width:
+                return w
+        return self.widths[-1]
+
+    def derivative_path(self, digest, width):
+        if self.fmt is None:
+            self.fmt = _output_format()
+        return os.path.join(self.cache_dir, f"{digest}-{width}.{self.fmt}")
+
+    def _source(self, path):
+        # Resolved file and content hash; the manifest saves a stat and a full read
+        if self.manifest is not None and path in self.manifest:
+            entry = self.manifest[path]
+            return (entry["path"], entry["hash"]) if entry else (None, None)
+        if not os.path.exists(path):
+            return None, None
+        return path, file_hash(path)
+
+    def _ensure(self, path, width):
+        src, digest = self._source(path)
+        if src is None:
+            return None, None
+
+        out = self.derivative_path(digest, width)
+        if os.path.exists(out):
+            metrics.cache_lookup("thumbnail_disk", True)
+            return out, None
+
+        metrics.cache_lookup("thumbnail_disk", False)
+        with metrics.span("thumbnail.render"):
+            data = _render(src, width, self.fmt)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{out}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out)  # atomic, so concurrent workers never read half a file
+        return out, data
+
+    def _memo(self, key, compute):
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                metrics.cache_lookup("thumbnail_lru", True)
+                return self._lru[key]
+
+        metrics.cache_lookup("thumbnail_lru", False)
+        value = compute()
+
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+        return value
+
+    def url(self, path, width=CARD_WIDTH):
+        # Static URL of the derivative, for <img loading="lazy"> tags
+        w = self._pick_width(width)
+
+        def compute():
+            out, _ = self._ensure(path, w)
+            return None if out is None else f"{STATIC_URL}/{os.path.basename(out)}"
+
+        return self._memo(("url", path, w), compute)
+
+    def srcset(self, path):
+        urls = [(self.url(path, w), w) for w in self.widths]
+        return ", ".join(f"{u} {w}w" for u, w in urls if u is not None)
+
+    def build_all(self, paths):
+        built = 0
+        for path in paths:
+            for w in self.widths:
+                if self.url(path, w) is not None:
+                    built += 1
+        return built
+
+
+# --------------------------------------------------
+# CLI: python thumbnails.py [images_dir]
+# --------------------------------------------------
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "images"
+    paths = [os.path.join(src, n) for n in sorted(os.listdir(src))
+             if n.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))]
+    count = ThumbnailCache().build_all(paths)
+    print(f"{count} thumbnails ready in {THUMB_DIR}/")
@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+import metrics
+from ticket_store import get_ticket_repo
+
+# --------------------------------------------------
+# Settings
+# --------------------------------------------------
+WINDOW = float(os.environ.get("SWIFTBUY_TICKET_WINDOW", "2"))            # seconds a product/session stays one ticket
+RATE = float(os.environ.get("SWIFTBUY_TICKET_RATE", "20"))               # tickets written per second
+BURST = int(os.environ.get("SWIFTBUY_TICKET_BURST", "100"))              # tickets written at once
+MAX_PENDING = int(os.environ.get("SWIFTBUY_TICKET_MAX_PENDING", "1000"))  # new keys rejected beyond this
+FLUSH_INTERVAL = 0.5
+
+log = logging.getLogger("swiftbuy.tickets")
+
+
+# --------------------------------------------------
+# Token bucket (refills at rate, holds at most burst)
+# --------------------------------------------------
+class TokenBucket:
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+
+    def take(self, n, now=None):
+        # Returns how many of the n tokens were granted
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        granted = min(n, int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+
+# --------------------------------------------------
+# Ticket ingestor (coalesce -> rate limit -> batch insert)
+# --------------------------------------------------
+class TicketIngestor:
+    def __init__(self, repo, window=WINDOW, rate=RATE, burst=BURST,
+                 max_pending=MAX_PENDING, flush_interval=FLUSH_INTERVAL):
+        self.repo = repo
+        self.window = window
+        self.max_pending = max_pending
+        self.bucket = TokenBucket(rate, burst)
+        self._pending = OrderedDict()    # (session, sku) -> [due, ticket]; due times only grow
+        self._lock = threading.Lock()
+        self.accepted = self.coalesced = self.dropped = self.written = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+        if flush_interval:
+            self._thread = threading.Thread(target=self._run, args=(flush_interval,),
+                                            name="ticket-ingest", daemon=True)
+            self._thread.start()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, session_id, sku, ticket, now=None):
+        # Returns False when the event was shed because the queue is full
+        now = time.monotonic() if now is None else now
+        key = (session_id, sku)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is not None:
+                # Same product from the same session inside the window: one ticket
+                entry[1]["severity"] = max(entry[1]["severity"], ticket["severity"])
+                self.coalesced += 1
+                metrics.count("tickets_coalesced")
+                return True
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                metrics.count("tickets_dropped")
+                return False
+            self._pending[key] = [now + self.window, ticket]
+            self.accepted += 1
+        return True
+
+    def flush(self, now=None, force=False):
+        # Writes due tickets in one batch, as many as the bucket allows
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            due = 0
+            for entry in self._pending.values():
+                if not force and entry[0] > now:
+                    break
+                due += 1
+            n = due if force else self.bucket.take(due, now)
+            batch = [self._pending.popitem(last=False) for _ in range(n)]
+        if not batch:
+            return 0
+        try:
+            with metrics.span("tickets.ingest_flush"):
+                self.repo.add_many([entry[1] for _, entry in batch])
+        except Exception:
+            # Put the batch back at the front so nothing is lost or reordered
+            with self._lock:
+                for key, entry in reversed(batch):
+                    self._pending.setdefault(key, entry)
+                    self._pending.move_to_end(key, last=False)
+            raise
+        self.written += len(batch)
+        return len(batch)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                log.exception("ticket flush failed")
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush(force=True)
+
+
+# --------------------------------------------------
+# Shared ingestor (one per process)
+# --------------------------------------------------
+@st.cache_resource
+def get_ticket_ingestor():
+    return TicketIngestor(get_ticket_repo())
@@ -0,0 +1,66 @@
+import heapq
+import itertools
+
+SEVERITY_WEIGHT = 0.7
+TIME_WEIGHT = 0.3   # per hour waited
+
+
+# --------------------------------------------------
+# Priority
+# --------------------------------------------------
+def aging_key(ticket):
+    # Priority at time now is -(SEVERITY_WEIGHT * severity + TIME_WEIGHT * hours waited),
+    # which equals aging_key(t) - TIME_WEIGHT * now_hours. The "now" term is the same for
+    # every ticket, so this key orders the queue correctly forever and tickets never need
+    # re-keying as they age.
+    created_hours = ticket["created_at"].timestamp() / 3600
+    return -SEVERITY_WEIGHT * ticket["severity"] + TIME_WEIGHT * created_hours
+
+
+# --------------------------------------------------
+# Ticket Queue (binary heap + id -> entry index)
+# --------------------------------------------------
+class TicketQueue:
+    def __init__(self, tickets=()):
+        self._heap = []
+        self._entries = {}
+        self._removed = 0
+        self._counter = itertools.count()
+        for t in tickets:
+            self.push(t)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def push(self, ticket):
+        # Entries are [key, seq, ticket]; seq is unique so ties never compare dicts
+        self.remove(ticket["id"])
+        entry = [aging_key(ticket), next(self._counter), ticket]
+        self._entries[ticket["id"]] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, ticket_id):
+        # Lazy delete: the heap slot is blanked and skipped later
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return None
+        ticket = entry[2]
+        entry[2] = None
+        self._removed += 1
+        if self._removed > 64 and self._removed > len(self._entries):
+            self._compact()
+        return ticket
+
+    def _compact(self):
+        self._heap = [e for e in self._heap if e[2] is not None]
+        heapq.heapify(self._heap)
+        self._removed = 0
+
+    def ordered(self):
+        # Yields tickets highest priority first; stopping early costs O(n + k log n)
+        heap = list(self._heap)
+        while heap:
+            ticket = heapq.heappop(heap)[2]
+            if ticket is not None:
+                yield ticket
+
@@ -0,0 +1,179 @@
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+import metrics
+from storage import get_store
+from ticket_queue import TicketQueue
+
+STATUSES = ("Pending", "Assigned", "Resolved")
+OPEN_STATUSES = ("Pending", "Assigned")
+RESOLVED_IN_MEMORY = int(os.environ.get("SWIFTBUY_RESOLVED_IN_MEMORY", "500"))  # older ones stay in the store
+
+
+# --------------------------------------------------
+# Ticket Repository (in-memory indexes over the shared store)
+# --------------------------------------------------
+class TicketRepository:
+    def __init__(self, store, resolved_in_memory=RESOLVED_IN_MEMORY):
+        self.store = store
+        self.resolved_in_memory = resolved_in_memory
+        self._rows = []          # insertion order; deleted rows become None
+        self._pos = {}           # id -> index in _rows
+        self._dead = 0
+        self._rev = 0            # last store revision applied
+        self._lock = threading.RLock()
+
+        # Secondary indexes
+        self._open = TicketQueue()                        # every non-resolved ticket
+        self._status = {s: TicketQueue() for s in STATUSES}
+        self._resolved = OrderedDict()                    # id -> rev, oldest resolution first
+        self.archived = 0                                 # resolved tickets evicted to the store
+
+        self._seed()
+
+    def __len__(self):
+        return len(self._pos)
+
+    def __iter__(self):
+        return (t for t in list(self._rows) if t is not None)
+
+    def get(self, ticket_id):
+        pos = self._pos.get(ticket_id)
+        return None if pos is None else self._rows[pos]
+
+    # --- writes go to the store, then come back through sync() ---
+    def add(self, ticket):
+        return self.add_many([ticket])[0]
+
+    def add_many(self, tickets):
+        tickets = self.store.add_tickets(tickets)
+        self.sync()
+        return [t["id"] for t in tickets]
+
+    def assign(self, ticket_id, agent):
+        self.store.update_ticket(ticket_id, status="Assigned", agent=agent)
+        self.sync()
+        return self.get(ticket_id)
+
+    def assign_many(self, assignments, expected=None):
+        # [(ticket_id, agent or None)]; None puts the ticket back to Pending.
+        # expected: ticket_id -> {field: value} the row must still have; other rows are skipped.
+        expected = expected or {}
+        written = self.store.update_tickets(
+            (ticket_id, {"status": "Assigned" if agent else "Pending", "agent": agent}, expected.get(ticket_id, {}))
+            for ticket_id, agent in assignments
+        )
+        self.sync()
+        return written
+
+    def resolve(self, ticket_id):
+        self.store.update_ticket(ticket_id, status="Resolved")
+        self.sync()
+        return self.get(ticket_id)
+
+    def delete(self, ticket_id):
+        self.store.delete_ticket(ticket_id)
+        self.sync()
+
+    def _seed(self):
+        # Cold start loads open tickets and the newest resolved ones, not every row ever written
+        with self._lock:
+            rev, rows, resolved = self.store.ticket_snapshot(self.resolved_in_memory)
+            for row in rows:
+                self._rev = row.pop("rev")
+                del row["deleted"]
+                self._insert(row)
+            self._rev = rev
+            self.archived = resolved - len(self._resolved)
+
+    def sync(self):
+        # Pull every change made since the last sync, by any session or process
+        with self._lock:
+            for row in self.store.ticket_changes(self._rev):
+                self._rev = row.pop("rev")
+                self._apply(row)
+            while len(self._resolved) > self.resolved_in_memory:
+                # Only the store keeps the oldest resolved tickets; see resolved_archive()
+                self._remove(next(iter(self._resolved)))
+                self.archived += 1
+
+    def _apply(self, row):
+        deleted = row.pop("deleted")
+        current = self.get(row["id"])
+        if deleted:
+            if current is not None:
+                self._remove(row["id"])
+        elif current is None:
+            self._insert(row)
+        else:
+            self._unindex(current)
+            current.update(row)
+            self._index(current)
+
+    # --- local rows and indexes ---
+    def _insert(self, ticket):
+        self._pos[ticket["id"]] = len(self._rows)
+        self._rows.append(ticket)
+        self._index(ticket)
+
+    def _remove(self, ticket_id):
+        pos = self._pos.pop(ticket_id)
+        self._unindex(self._rows[pos])
+        self._rows[pos] = None   # tombstone
+        self._dead += 1
+        if self._dead > 32 and self._dead > len(self._pos):
+            self._compact()
+
+    def _index(self, ticket):
+        self._status.setdefault(ticket["status"], TicketQueue()).push(ticket)
+        if ticket["status"] in OPEN_STATUSES:
+            self._open.push(ticket)
+        if ticket["status"] == "Resolved":
+            self._resolved[ticket["id"]] = self._rev
+
+    def _unindex(self, ticket):
+        self._status[ticket["status"]].remove(ticket["id"])
+        self._open.remove(ticket["id"])
+        self._resolved.pop(ticket["id"], None)
+
+    def _compact(self):
+        self._rows = [t for t in self._rows if t is not None]
+        self._pos = {t["id"]: i for i, t in enumerate(self._rows)}
+        self._dead = 0
+
+    # --- reads (highest priority first) ---
+    def open_tickets(self):
+        return self._open.ordered()
+
+    def by_status(self, status):
+        queue = self._status.get(status)
+        return queue.ordered() if queue else iter(())
+
+    def count(self, status):
+        queue = self._status.get(status)
+        return len(queue) if queue else 0
+
+    def resolved_archive(self, before=None, limit=50):
+        # Evicted resolved tickets, most recently resolved first, read from the store on demand.
+        # Pass the last row's "rev" as before to get the next page.
+        if before is None:
+            before = next(iter(self._resolved.values()), self._rev + 1)
+        return self.store.resolved_before(before, limit)
+
+
+# --------------------------------------------------
+# Shared repository (one per process, synced with the store on each use)
+# --------------------------------------------------
+@st.cache_resource
+def _shared_repo():
+    return TicketRepository(get_store())
+
+
+def get_ticket_repo():
+    repo = _shared_repo()
+    with metrics.span("tickets.sync"):
+        repo.sync()
+    return repo